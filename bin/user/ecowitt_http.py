@@ -98,18 +98,21 @@ import calendar
 import collections
 import csv
 import datetime
-import io
+import functools
+import http.client
+import itertools
 import json
 import logging
-import operator
 import queue
 import re
+import selectors
 import socket
 import struct
 import sys
 import textwrap
 import threading
 import time
+import types
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -127,11 +130,19 @@ import weewx.defaults
 import weewx.drivers
 import weewx.engine
 import weewx.units
-import weewx.wxformulas
 from weeutil.weeutil import bcolors, timestamp_to_string
 
 log = logging.getLogger(__name__)
 
+# Use orjson to deserialize API responses if it is installed, otherwise use the
+# python json module. orjson.JSONDecodeError is a subclass of
+# json.JSONDecodeError so either may be caught using json.JSONDecodeError.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 
 DRIVER_NAME = 'EcowittHttp'
 DRIVER_VERSION = '0.1.0a28'
@@ -149,6 +160,11 @@ KNOWN_SENSORS = ('wh25', 'wh26', 'wn31', 'wn34', 'wn35',
                  'wh40', 'wh41', 'wh45',
                  'wh51', 'wh54', 'wh55', 'wh57',
                  'wh65', 'wh68', 'ws80', 'ws85', 'ws90')
+# frozenset equivalents of the above for use in membership tests, the tuples
+# are retained where order matters
+SUPPORTED_DEVICES_SET = frozenset(SUPPORTED_DEVICES)
+UNSUPPORTED_DEVICES_SET = frozenset(UNSUPPORTED_DEVICES)
+KNOWN_DEVICES_SET = frozenset(KNOWN_DEVICES)
 # default max number of attempts to obtain data from the device
 DEFAULT_MAX_TRIES = 3
 # default wait time between retries when attempting to obtain data from the
@@ -166,6 +182,9 @@ DEFAULT_CATCHUP_RETRIES = 3
 DEFAULT_MAX_AGE = 60
 # default device poll interval
 DEFAULT_POLL_INTERVAL = 20
+# default max number of items held in the collector queue, once full the
+# oldest item is discarded to make way for the newest
+DEFAULT_MAX_QUEUE_SIZE = 64
 # default discovery port
 DEFAULT_DISCOVERY_PORT = 59387
 # default discovery listening period
@@ -187,376 +206,132 @@ DEFAULT_FW_CHECK_INTERVAL = 86400
 # default is to only accept data from registered sensors (True).
 DEFAULT_ONLY_REGISTERED_SENSORS = True
 
-# define the WeeWX unit group used by each device field
-DEFAULT_GROUPS = {
-    'datetime': 'group_time',
-    'common_list.0x02.val': 'group_temperature',
-    'common_list.0x02.battery': 'group_count',
-    'common_list.0x02.voltage': 'group_volt',
-    'common_list.0x03.val': 'group_temperature',
-    'common_list.0x03.battery': 'group_count',
-    'common_list.0x03.voltage': 'group_volt',
-    'common_list.3.val': 'group_temperature',
-    'common_list.3.battery': 'group_count',
-    'common_list.3.voltage': 'group_volt',
-    'common_list.0x04.val': 'group_temperature',
-    'common_list.0x04.battery': 'group_count',
-    'common_list.0x04.voltage': 'group_volt',
-    'common_list.4.val': 'group_temperature',
-    'common_list.4.battery': 'group_count',
-    'common_list.4.voltage': 'group_volt',
-    'common_list.0x05.val': 'group_temperature',
-    'common_list.0x05.battery': 'group_count',
-    'common_list.0x05.voltage': 'group_volt',
-    'common_list.5.val': 'group_pressure',
-    'common_list.5.battery': 'group_count',
-    'common_list.5.voltage': 'group_volt',
-    'common_list.0x07.val': 'group_percent',
-    'common_list.0x07.battery': 'group_count',
-    'common_list.0x07.voltage': 'group_volt',
-    'common_list.0x0A.val': 'group_direction',
-    'common_list.0x0A.battery': 'group_count',
-    'common_list.0x0A.voltage': 'group_volt',
-    'common_list.0x0B.val': 'group_speed',
-    'common_list.0x0B.battery': 'group_count',
-    'common_list.0x0B.voltage': 'group_volt',
-    'common_list.0x0C.val': 'group_speed',
-    'common_list.0x0C.battery': 'group_count',
-    'common_list.0x0C.voltage': 'group_volt',
-    'common_list.0x0F.val': 'group_speed',
-    'common_list.0x0F.battery': 'group_count',
-    'common_list.0x0F.voltage': 'group_volt',
-    'common_list.0x14.val': 'group_speed',
-    'common_list.0x14.battery': 'group_count',
-    'common_list.0x14.voltage': 'group_volt',
-    'common_list.0x15.val': 'group_illuminance',
-    'common_list.0x15.battery': 'group_count',
-    'common_list.0x15.voltage': 'group_volt',
-    'common_list.0x16.val': 'group_radiation',
-    'common_list.0x16.battery': 'group_count',
-    'common_list.0x16.voltage': 'group_volt',
-    'common_list.0x17.val': 'group_uv',
-    'common_list.0x17.battery': 'group_count',
-    'common_list.0x17.voltage': 'group_volt',
-    'common_list.0x19.val': 'group_speed',
-    'common_list.0x19.battery': 'group_count',
-    'common_list.0x19.voltage': 'group_volt',
-    'rain.0x0D.val': 'group_rain',
-    'rain.0x0D.battery': 'group_count',
-    'rain.0x0D.voltage': 'group_volt',
-    'rain.0x0E.val': 'group_rainrate',
-    'rain.0x0E.battery': 'group_count',
-    'rain.0x0E.voltage': 'group_volt',
-    'rain.0x10.val': 'group_rain',
-    'rain.0x10.battery': 'group_count',
-    'rain.0x10.voltage': 'group_volt',
-    'rain.0x11.val': 'group_rain',
-    'rain.0x11.battery': 'group_count',
-    'rain.0x11.voltage': 'group_volt',
-    'rain.0x12.val': 'group_rain',
-    'rain.0x12.battery': 'group_count',
-    'rain.0x12.voltage': 'group_volt',
-    'rain.0x13.val': 'group_rain',
-    't_rain': 'group_rain',
-    't_rainhour': 'group_rain',
-    #    'rain.0x13.battery': 'group_count',
-    'rain.0x13.voltage': 'group_volt',
-    'piezoRain.srain_piezo.val': 'group_boolean',
-    'piezoRain.0x0D.val': 'group_rain',
-    'piezoRain.0x0D.battery': 'group_count',
-    'piezoRain.0x0D.voltage': 'group_volt',
-    'piezoRain.0x0E.val': 'group_rainrate',
-    'piezoRain.0x0E.battery': 'group_count',
-    'piezoRain.0x0E.voltage': 'group_volt',
-    'piezoRain.0x10.val': 'group_rain',
-    'piezoRain.0x10.battery': 'group_count',
-    'piezoRain.0x10.voltage': 'group_volt',
-    'piezoRain.0x11.val': 'group_rain',
-    'piezoRain.0x11.battery': 'group_count',
-    'piezoRain.0x11.voltage': 'group_volt',
-    'piezoRain.0x12.val': 'group_rain',
-    'piezoRain.0x12.battery': 'group_count',
-    'piezoRain.0x12.voltage': 'group_volt',
-    'piezoRain.0x13.val': 'group_rain',
-    'piezoRain.0x13.voltage': 'group_volt',
-    'piezoRain.srain_piezo': 'group_boolean',
-    'p_rain': 'group_rain',
-    'p_rainhour': 'group_rain',
-    'wh25.intemp': 'group_temperature',
-    'wh25.inhumi': 'group_percent',
-    'wh25.abs': 'group_pressure',
-    'wh25.rel': 'group_pressure',
-#    'wh25.CO2': 'group_fraction',
-#    'wh25.CO2_24H': 'group_fraction',
-    'lightning.distance': 'group_distance',
-    'lightning.timestamp': 'group_time',
-    'lightning.count': 'group_count',
-    'co2.temp': 'group_temperature',
-    'co2.humidity': 'group_percent',
-    'co2.PM25': 'group_concentration',
-    'co2.PM25_RealAQI': 'group_count',
-    'co2.PM25_24HAQI': 'group_count',
-    'co2.PM10': 'group_concentration',
-    'co2.PM10_RealAQI': 'group_count',
-    'co2.PM10_24HAQI': 'group_count',
-    'co2.CO2': 'group_fraction',
-    'co2.CO2_24H': 'group_fraction',
-#    'co2.battery': 'group_count',
-    'ch_pm25.1.PM25': 'group_concentration',
-    'ch_pm25.1.PM25_RealAQI': 'group_count',
-    'ch_pm25.1.PM25_24HAQI': 'group_count',
-    'ch_pm25.2.PM25': 'group_concentration',
-    'ch_pm25.2.PM25_RealAQI': 'group_count',
-    'ch_pm25.2.PM25_24HAQI': 'group_count',
-    'ch_pm25.3.PM25': 'group_concentration',
-    'ch_pm25.3.PM25_RealAQI': 'group_count',
-    'ch_pm25.3.PM25_24HAQI': 'group_count',
-    'ch_pm25.4.PM25': 'group_concentration',
-    'ch_pm25.4.PM25_RealAQI': 'group_count',
-    'ch_pm25.4.PM25_24HAQI': 'group_count',
-    'ch_leak.1.status': 'group_count',
-    'ch_leak.2.status': 'group_count',
-    'ch_leak.3.status': 'group_count',
-    'ch_leak.4.status': 'group_count',
-    'ch_aisle.1.temp': 'group_temperature',
-    'ch_aisle.1.humidity': 'group_percent',
-    'ch_aisle.2.temp': 'group_temperature',
-    'ch_aisle.2.humidity': 'group_percent',
-    'ch_aisle.3.temp': 'group_temperature',
-    'ch_aisle.3.humidity': 'group_percent',
-    'ch_aisle.4.temp': 'group_temperature',
-    'ch_aisle.4.humidity': 'group_percent',
-    'ch_aisle.5.temp': 'group_temperature',
-    'ch_aisle.5.humidity': 'group_percent',
-    'ch_aisle.6.temp': 'group_temperature',
-    'ch_aisle.6.humidity': 'group_percent',
-    'ch_aisle.7.temp': 'group_temperature',
-    'ch_aisle.7.humidity': 'group_percent',
-    'ch_aisle.8.temp': 'group_temperature',
-    'ch_aisle.8.humidity': 'group_percent',
-    'ch_soil.1.humidity': 'group_percent',
-    'ch_soil.1.voltage': 'group_volt',
-    'ch_soil.2.humidity': 'group_percent',
-    'ch_soil.2.voltage': 'group_volt',
-    'ch_soil.3.humidity': 'group_percent',
-    'ch_soil.3.voltage': 'group_volt',
-    'ch_soil.4.humidity': 'group_percent',
-    'ch_soil.4.voltage': 'group_volt',
-    'ch_soil.5.humidity': 'group_percent',
-    'ch_soil.5.voltage': 'group_volt',
-    'ch_soil.6.humidity': 'group_percent',
-    'ch_soil.6.voltage': 'group_volt',
-    'ch_soil.7.humidity': 'group_percent',
-    'ch_soil.7.voltage': 'group_volt',
-    'ch_soil.8.humidity': 'group_percent',
-    'ch_soil.8.voltage': 'group_volt',
-    'ch_soil.9.humidity': 'group_percent',
-    'ch_soil.9.voltage': 'group_volt',
-    'ch_soil.10.humidity': 'group_percent',
-    'ch_soil.10.voltage': 'group_volt',
-    'ch_soil.11.humidity': 'group_percent',
-    'ch_soil.11.voltage': 'group_volt',
-    'ch_soil.12.humidity': 'group_percent',
-    'ch_soil.12.voltage': 'group_volt',
-    'ch_soil.13.humidity': 'group_percent',
-    'ch_soil.13.voltage': 'group_volt',
-    'ch_soil.14.humidity': 'group_percent',
-    'ch_soil.14.voltage': 'group_volt',
-    'ch_soil.15.humidity': 'group_percent',
-    'ch_soil.15.voltage': 'group_volt',
-    'ch_soil.16.humidity': 'group_percent',
-    'ch_soil.16.voltage': 'group_volt',
-    'ch_temp.1.temp': 'group_temperature',
-    'ch_temp.1.voltage': 'group_volt',
-    'ch_temp.2.temp': 'group_temperature',
-    'ch_temp.2.voltage': 'group_volt',
-    'ch_temp.3.temp': 'group_temperature',
-    'ch_temp.3.voltage': 'group_volt',
-    'ch_temp.4.temp': 'group_temperature',
-    'ch_temp.4.voltage': 'group_volt',
-    'ch_temp.5.temp': 'group_temperature',
-    'ch_temp.5.voltage': 'group_volt',
-    'ch_temp.6.temp': 'group_temperature',
-    'ch_temp.6.voltage': 'group_volt',
-    'ch_temp.7.temp': 'group_temperature',
-    'ch_temp.7.voltage': 'group_volt',
-    'ch_temp.8.temp': 'group_temperature',
-    'ch_temp.8.voltage': 'group_volt',
-    'ch_leaf.1.humidity': 'group_percent',
-    'ch_leaf.2.humidity': 'group_percent',
-    'ch_leaf.3.humidity': 'group_percent',
-    'ch_leaf.4.humidity': 'group_percent',
-    'ch_leaf.5.humidity': 'group_percent',
-    'ch_leaf.6.humidity': 'group_percent',
-    'ch_leaf.7.humidity': 'group_percent',
-    'ch_leaf.8.humidity': 'group_percent',
-    'ch_lds.1.air': 'group_depth',
-    'ch_lds.1.depth': 'group_depth',
-    'ch_lds.1.heat': 'group_count',
-    'ch_lds.1.voltage': 'group_volt',
-    'ch_lds.2.air': 'group_depth',
-    'ch_lds.2.depth': 'group_depth',
-    'ch_lds.2.heat': 'group_count',
-    'ch_lds.2.voltage': 'group_volt',
-    'ch_lds.3.air': 'group_depth',
-    'ch_lds.3.depth': 'group_depth',
-    'ch_lds.3.heat': 'group_count',
-    'ch_lds.3.voltage': 'group_volt',
-    'ch_lds.4.air': 'group_depth',
-    'ch_lds.4.depth': 'group_depth',
-    'ch_lds.4.heat': 'group_count',
-    'ch_lds.4.voltage': 'group_volt',
-    'debug.heap': 'group_data',
-    'debug.runtime': 'group_deltatime',
-    'debug.usr_interval': 'group_deltatime',
-    'debug.is_cnip': 'group_boolean',
-    'wh26.battery': 'group_count',
-    'wh25.battery': 'group_count',
-    'wh24.battery': 'group_count',
-    'wh65.battery': 'group_count',
-    'wn32.battery': 'group_count',
-    'wn32p.battery': 'group_count',
-    'wn31.ch1.battery': 'group_count',
-    'wn31.ch2.battery': 'group_count',
-    'wn31.ch3.battery': 'group_count',
-    'wn31.ch4.battery': 'group_count',
-    'wn31.ch5.battery': 'group_count',
-    'wn31.ch6.battery': 'group_count',
-    'wn31.ch7.battery': 'group_count',
-    'wn31.ch8.battery': 'group_count',
-    'wn34.ch1.battery': 'group_count',
-    'wn34.ch2.battery': 'group_count',
-    'wn34.ch3.battery': 'group_count',
-    'wn34.ch4.battery': 'group_count',
-    'wn34.ch5.battery': 'group_count',
-    'wn34.ch6.battery': 'group_count',
-    'wn34.ch7.battery': 'group_count',
-    'wn34.ch8.battery': 'group_count',
-    'wn35.ch1.battery': 'group_count',
-    'wn35.ch2.battery': 'group_count',
-    'wn35.ch3.battery': 'group_count',
-    'wn35.ch4.battery': 'group_count',
-    'wn35.ch5.battery': 'group_count',
-    'wn35.ch6.battery': 'group_count',
-    'wn35.ch7.battery': 'group_count',
-    'wn35.ch8.battery': 'group_count',
-    'wh40.battery': 'group_count',
-    'wh41.ch1.battery': 'group_count',
-    'wh41.ch2.battery': 'group_count',
-    'wh41.ch3.battery': 'group_count',
-    'wh41.ch4.battery': 'group_count',
-    'wh45.battery': 'group_count',
-    'wh51.ch1.battery': 'group_count',
-    'wh51.ch2.battery': 'group_count',
-    'wh51.ch3.battery': 'group_count',
-    'wh51.ch4.battery': 'group_count',
-    'wh51.ch5.battery': 'group_count',
-    'wh51.ch6.battery': 'group_count',
-    'wh51.ch7.battery': 'group_count',
-    'wh51.ch8.battery': 'group_count',
-    'wh51.ch9.battery': 'group_count',
-    'wh51.ch10.battery': 'group_count',
-    'wh51.ch11.battery': 'group_count',
-    'wh51.ch12.battery': 'group_count',
-    'wh51.ch13.battery': 'group_count',
-    'wh51.ch14.battery': 'group_count',
-    'wh51.ch15.battery': 'group_count',
-    'wh51.ch16.battery': 'group_count',
-    'wh54.ch1.battery': 'group_count',
-    'wh54.ch2.battery': 'group_count',
-    'wh54.ch3.battery': 'group_count',
-    'wh54.ch4.battery': 'group_count',
-    'wh55.ch1.battery': 'group_count',
-    'wh55.ch2.battery': 'group_count',
-    'wh55.ch3.battery': 'group_count',
-    'wh55.ch4.battery': 'group_count',
-    'wh57.battery': 'group_count',
-    'wh68.battery': 'group_count',
-    'ws80.battery': 'group_count',
-    'ws85.battery': 'group_count',
-    'ws90.battery': 'group_count',
-    'wh51.ch1.voltage': 'group_volt',
-    'wh51.ch2.voltage': 'group_volt',
-    'wh51.ch3.voltage': 'group_volt',
-    'wh51.ch4.voltage': 'group_volt',
-    'wh51.ch5.voltage': 'group_volt',
-    'wh51.ch6.voltage': 'group_volt',
-    'wh51.ch7.voltage': 'group_volt',
-    'wh51.ch8.voltage': 'group_volt',
-    'wh51.ch9.voltage': 'group_volt',
-    'wh51.ch10.voltage': 'group_volt',
-    'wh51.ch11.voltage': 'group_volt',
-    'wh51.ch12.voltage': 'group_volt',
-    'wh51.ch13.voltage': 'group_volt',
-    'wh51.ch14.voltage': 'group_volt',
-    'wh51.ch15.voltage': 'group_volt',
-    'wh51.ch16.voltage': 'group_volt',
-    'wh26.signal': 'group_count',
-    'wh25.signal': 'group_count',
-    'wh24.signal': 'group_count',
-    'wh65.signal': 'group_count',
-    'wn32.signal': 'group_count',
-    'wn32p.signal': 'group_count',
-    'wn31.ch1.signal': 'group_count',
-    'wn31.ch2.signal': 'group_count',
-    'wn31.ch3.signal': 'group_count',
-    'wn31.ch4.signal': 'group_count',
-    'wn31.ch5.signal': 'group_count',
-    'wn31.ch6.signal': 'group_count',
-    'wn31.ch7.signal': 'group_count',
-    'wn31.ch8.signal': 'group_count',
-    'wn34.ch1.signal': 'group_count',
-    'wn34.ch2.signal': 'group_count',
-    'wn34.ch3.signal': 'group_count',
-    'wn34.ch4.signal': 'group_count',
-    'wn34.ch5.signal': 'group_count',
-    'wn34.ch6.signal': 'group_count',
-    'wn34.ch7.signal': 'group_count',
-    'wn34.ch8.signal': 'group_count',
-    'wn35.ch1.signal': 'group_count',
-    'wn35.ch2.signal': 'group_count',
-    'wn35.ch3.signal': 'group_count',
-    'wn35.ch4.signal': 'group_count',
-    'wn35.ch5.signal': 'group_count',
-    'wn35.ch6.signal': 'group_count',
-    'wn35.ch7.signal': 'group_count',
-    'wn35.ch8.signal': 'group_count',
-    'wh40.signal': 'group_count',
-    'wh41.ch1.signal': 'group_count',
-    'wh41.ch2.signal': 'group_count',
-    'wh41.ch3.signal': 'group_count',
-    'wh41.ch4.signal': 'group_count',
-    'wh45.signal': 'group_count',
-    'wh51.ch1.signal': 'group_count',
-    'wh51.ch2.signal': 'group_count',
-    'wh51.ch3.signal': 'group_count',
-    'wh51.ch4.signal': 'group_count',
-    'wh51.ch5.signal': 'group_count',
-    'wh51.ch6.signal': 'group_count',
-    'wh51.ch7.signal': 'group_count',
-    'wh51.ch8.signal': 'group_count',
-    'wh51.ch9.signal': 'group_count',
-    'wh51.ch10.signal': 'group_count',
-    'wh51.ch11.signal': 'group_count',
-    'wh51.ch12.signal': 'group_count',
-    'wh51.ch13.signal': 'group_count',
-    'wh51.ch14.signal': 'group_count',
-    'wh51.ch15.signal': 'group_count',
-    'wh51.ch16.signal': 'group_count',
-    'wh54.ch1.signal': 'group_count',
-    'wh54.ch2.signal': 'group_count',
-    'wh54.ch3.signal': 'group_count',
-    'wh54.ch4.signal': 'group_count',
-    'wh55.ch1.signal': 'group_count',
-    'wh55.ch2.signal': 'group_count',
-    'wh55.ch3.signal': 'group_count',
-    'wh55.ch4.signal': 'group_count',
-    'wh57.signal': 'group_count',
-    'wh68.signal': 'group_count',
-    'ws80.signal': 'group_count',
-    'ws85.signal': 'group_count',
-    'ws90.signal': 'group_count'
-}
+# precompiled regular expressions
+# sensor channel sub-string in a sensor 'name' field, eg 'CH3'
+_RE_CHANNEL = re.compile(r'CH\d+')
+# numeric value and unit portions of an observation value string, eg '12.3 mm'
+_RE_VALUE_UNIT = re.compile(r'([0-9.,+-]+)(.*)')
+# runs of digits, used when naturally sorting strings
+_RE_DIGITS = re.compile(r'(\d+)')
+
+
+# Device 'battery', 'signal' and 'voltage' fields always belong to the same
+# WeeWX unit group irrespective of the sensor concerned. Rather than include
+# an entry in DEFAULT_GROUPS for every such field the unit group is
+# determined from the final component of the field name.
+_CONSTANT_GROUPS = {'battery': 'group_count',
+                    'signal': 'group_count',
+                    'voltage': 'group_volt'}
+
+
+def _build_default_groups():
+    """Construct the map of device field to WeeWX unit group.
+
+    Most device fields follow a small number of regular patterns (eg each
+    channelised sensor has the same fields per channel), so rather than define
+    each device field individually the map is generated from a compact
+    specification. Generated keys are interned as they are used repeatedly as
+    dict keys when assigning unit groups.
+
+    'battery', 'signal' and 'voltage' fields are not included, the unit group
+    for these fields is determined by default_group() using _CONSTANT_GROUPS.
+
+    Returns a dict keyed by 'dotted' device field name with the WeeWX unit
+    group name as the value.
+    """
+
+    groups = {'datetime': 'group_time'}
+    # common_list observations, only the 'val' field unit group differs by
+    # observation
+    for _id, group in (('0x02', 'group_temperature'), ('0x03', 'group_temperature'),
+                       ('3', 'group_temperature'), ('0x04', 'group_temperature'),
+                       ('4', 'group_temperature'), ('0x05', 'group_temperature'),
+                       ('5', 'group_pressure'), ('0x07', 'group_percent'),
+                       ('0x0A', 'group_direction'), ('0x0B', 'group_speed'),
+                       ('0x0C', 'group_speed'), ('0x0F', 'group_speed'),
+                       ('0x14', 'group_speed'), ('0x15', 'group_illuminance'),
+                       ('0x16', 'group_radiation'), ('0x17', 'group_uv'),
+                       ('0x19', 'group_speed')):
+        groups[sys.intern(f'common_list.{_id}.val')] = group
+    # traditional and piezo rain observations
+    for section, (_id, group) in itertools.product(('rain', 'piezoRain'),
+                                                   (('0x0D', 'group_rain'),
+                                                    ('0x0E', 'group_rainrate'),
+                                                    ('0x10', 'group_rain'),
+                                                    ('0x11', 'group_rain'),
+                                                    ('0x12', 'group_rain'),
+                                                    ('0x13', 'group_rain'))):
+        groups[sys.intern(f'{section}.{_id}.val')] = group
+    # non-channelised device fields
+    groups.update({
+        't_rain': 'group_rain',
+        't_rainhour': 'group_rain',
+        'piezoRain.srain_piezo.val': 'group_boolean',
+        'piezoRain.srain_piezo': 'group_boolean',
+        'p_rain': 'group_rain',
+        'p_rainhour': 'group_rain',
+        'wh25.intemp': 'group_temperature',
+        'wh25.inhumi': 'group_percent',
+        'wh25.abs': 'group_pressure',
+        'wh25.rel': 'group_pressure',
+        'lightning.distance': 'group_distance',
+        'lightning.timestamp': 'group_time',
+        'lightning.count': 'group_count',
+        'co2.temp': 'group_temperature',
+        'co2.humidity': 'group_percent',
+        'co2.PM25': 'group_concentration',
+        'co2.PM25_RealAQI': 'group_count',
+        'co2.PM25_24HAQI': 'group_count',
+        'co2.PM10': 'group_concentration',
+        'co2.PM10_RealAQI': 'group_count',
+        'co2.PM10_24HAQI': 'group_count',
+        'co2.CO2': 'group_fraction',
+        'co2.CO2_24H': 'group_fraction',
+        'debug.heap': 'group_data',
+        'debug.runtime': 'group_deltatime',
+        'debug.usr_interval': 'group_deltatime',
+        'debug.is_cnip': 'group_boolean'
+    })
+    # channelised observations, format is (section, number of channels,
+    # ((field, unit group), ...))
+    for section, channels, attrs in (('ch_pm25', 4, (('PM25', 'group_concentration'),
+                                                     ('PM25_RealAQI', 'group_count'),
+                                                     ('PM25_24HAQI', 'group_count'))),
+                                     ('ch_leak', 4, (('status', 'group_count'),)),
+                                     ('ch_aisle', 8, (('temp', 'group_temperature'),
+                                                      ('humidity', 'group_percent'))),
+                                     ('ch_soil', 16, (('humidity', 'group_percent'),)),
+                                     ('ch_temp', 8, (('temp', 'group_temperature'),)),
+                                     ('ch_leaf', 8, (('humidity', 'group_percent'),)),
+                                     ('ch_lds', 4, (('air', 'group_depth'),
+                                                    ('depth', 'group_depth'),
+                                                    ('heat', 'group_count')))):
+        for ch, (attr, group) in itertools.product(range(1, channels + 1), attrs):
+            groups[sys.intern(f'{section}.{ch}.{attr}')] = group
+    return groups
+
+
+# define the WeeWX unit group used by each device field, the map is exposed as
+# a read only view to prevent accidental modification
+DEFAULT_GROUPS = types.MappingProxyType(_build_default_groups())
+
+
+def default_group(field):
+    """Obtain the default WeeWX unit group for a device field.
+
+    Device 'battery', 'signal' and 'voltage' fields are assigned a unit group
+    from _CONSTANT_GROUPS, all other fields are looked up in DEFAULT_GROUPS.
+    Raises a KeyError if no unit group is known for the field.
+    """
+
+    # obtain the final component of the 'dotted' field name
+    attr = field.rpartition('.')[2]
+    # if the final component is one of our constant group fields return the
+    # constant group
+    if attr in _CONSTANT_GROUPS:
+        return _CONSTANT_GROUPS[attr]
+    # otherwise look up the field in DEFAULT_GROUPS
+    return DEFAULT_GROUPS[field]
 
 
 # ============================================================================
@@ -569,6 +344,8 @@ DEFAULT_GROUPS = {
 class InvertibleSetError(Exception):
     """Must set a unique value in a InvertibleMap."""
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
         msg = 'The value "{}" is already in the mapping.'
@@ -605,12 +382,21 @@ class InvertibleMap(dict):
     """
 
     def __init__(self, *args, inverse=None, **kwargs):
-        super().__init__(*args, **kwargs)
         if inverse is None:
-            _inv = dict()
-            for key, value in self.items():
-                _inv[value] = key
-            inverse = self.__class__(_inv, inverse=self, **kwargs)
+            # we are constructing the forward map, build the forward and
+            # inverse dicts in bulk
+            super().__init__(*args, **kwargs)
+            # construct the inverse dict, if the source data contains
+            # duplicate values the inverse maps the value to the last key
+            # with that value
+            _inv = {value: key for key, value in self.items()}
+            # create the inverse map directly from the inverse dict, there is
+            # no need to have the inverse map re-scan its data
+            inverse = self.__class__.__new__(self.__class__)
+            dict.__init__(inverse, _inv)
+            inverse.inverse = self
+        else:
+            super().__init__(*args, **kwargs)
         self.inverse = inverse
 
     def __setitem__(self, key, value):
@@ -634,6 +420,33 @@ class InvertibleMap(dict):
         self.inverse._del_item(self[key])
         return super().pop(key)
 
+    def rekey(self, old_key, new_key):
+        """Change the key of an existing entry.
+
+        Equivalent to popping the entry and re-adding the value under the new
+        key, but the inverse map entry is updated in place.
+        """
+
+        value = self[old_key]
+        self._del_item(old_key)
+        self._set_item(new_key, value)
+        self.inverse._set_item(value, new_key)
+
+    def copy(self):
+        """Return a shallow copy of an InvertibleMap.
+
+        The forward and inverse dicts are copied directly, the copy does not
+        need to re-derive (and re-check) the inverse from the forward map.
+        """
+
+        new_map = self.__class__.__new__(self.__class__)
+        dict.__init__(new_map, self)
+        new_inverse = self.__class__.__new__(self.__class__)
+        dict.__init__(new_inverse, self.inverse)
+        new_map.inverse = new_inverse
+        new_inverse.inverse = new_map
+        return new_map
+
 
 # ============================================================================
 #                 Ecowitt Local HTTP API driver error classes
@@ -687,6 +500,11 @@ class DebugOptions:
 
     debug_groups = ('rain', 'wind', 'loop', 'sensors', 'parser',
                     'catchup', 'collector')
+    # DebugOptions objects have a fixed set of attributes, use __slots__ to
+    # avoid a per-instance __dict__ and speed attribute access
+    __slots__ = ('_debug_rain', '_debug_wind', '_debug_loop', '_debug_sensors',
+                 '_debug_parser', '_debug_catchup', '_debug_collector',
+                 '_any', '_flags')
 
     def __init__(self, **config):
         # get any specific debug settings
@@ -711,6 +529,13 @@ class DebugOptions:
         self._debug_catchup = 'catchup' in lower_debug_list
         # collector
         self._debug_collector = 'collector' in lower_debug_list
+        # the debug options do not change once set, so determine now whether
+        # we are performing any debugging
+        self._any = any((self._debug_rain, self._debug_wind, self._debug_loop,
+                         self._debug_sensors, self._debug_parser,
+                         self._debug_catchup, self._debug_collector))
+        # the set of debug groups that are enabled
+        self._flags = frozenset(g for g in self.debug_groups if getattr(self, g))
 
     @property
     def rain(self):
@@ -758,10 +583,23 @@ class DebugOptions:
     def any(self):
         """Are we performing any debugging."""
 
-        for debug_group in self.debug_groups:
-            if getattr(self, debug_group):
-                return True
-        return False
+        return self._any
+
+    @property
+    def flags(self):
+        """The set of debug groups that are enabled."""
+
+        return self._flags
+
+
+# Source fields whose mapped dest field is to be renamed when a WN32 sensor is
+# in use, format is (source field, dest field sub-string, replacement
+# sub-string). A WN32 may provide indoor (in lieu of a WH25) and/or outdoor (a
+# WN32P in lieu of a WH26) data.
+_WN32_INDOOR_RENAMES = (('wh25.battery', 'wh25', 'wn32'),
+                        ('wh25.signal', 'wh25', 'wn32'))
+_WN32_OUTDOOR_RENAMES = (('wh26.battery', 'wh26', 'wn32p'),
+                         ('wh26.signal', 'wh26', 'wn32p'))
 
 
 # ============================================================================
@@ -821,11 +659,22 @@ class FieldMapper:
                        field map extensions definitions
     """
 
+    # mapper objects have a fixed set of attributes, use __slots__ to avoid a
+    # per-instance __dict__ and speed attribute access in map_data()
+    __slots__ = ('driver_debug', 'wn32_indoor', 'wn32_outdoor', 'field_map',
+                 '_map_items', '_source_map', '_batch', '_debug_any')
+
     def __init__(self, driver_debug=None, default_map=None, **mapper_config):
         """Initialise a FieldMapper object."""
 
         # save our driver debug options
         self.driver_debug = driver_debug
+        # Our debug options do not change, so determine once whether we are
+        # debugging in any way. The driver debug options may be a
+        # DebugOptions object or None, so be prepared for either.
+        self._debug_any = (getattr(driver_debug, 'any', False)
+                           or getattr(driver_debug, 'debug', 0) >= 1
+                           or weewx.debug > 0)
         # Depending on the model a WN32 TH sensor can override/provide indoor
         # and/or outdoor TH data and outdoor pressure data to the device. The
         # use of WN32 data by the device is transparent to the driver does not
@@ -840,6 +689,71 @@ class FieldMapper:
         # construct my field map
         self.field_map = self.construct_field_map(def_map=def_map,
                                                   **mapper_config)
+        # Mapping data is performed for every packet, so keep snapshots of
+        # the field map for use by map_data(). Any changes to the field map
+        # after initialisation must be followed by a refresh of these
+        # snapshots.
+        self.refresh_map_items()
+
+    def refresh_map_items(self):
+        """Refresh the field map snapshots used by map_data().
+
+        Two snapshots of the field map are kept; a tuple of (dest, source)
+        pairs and a dict keyed by source field with a tuple of the dest
+        field(s) as the value. A source field may be mapped to more than one
+        dest field. Field names in the snapshots are interned.
+        """
+
+        # Field names are used repeatedly as dict keys and in membership
+        # tests when mapping data, so intern them. This applies equally to
+        # default field names and those obtained from the driver config.
+        self._map_items = tuple((sys.intern(dest), sys.intern(source))
+                                for dest, source in self.field_map.items())
+        source_map = {}
+        for dest, source in self._map_items:
+            source_map[source] = source_map.get(source, ()) + (dest,)
+        self._source_map = source_map
+        # discard any cached batch extraction details, they may no longer
+        # reflect the field map
+        self._batch = (None, (), lambda rec: ())
+
+    def set_batch(self, rec):
+        """Determine the batch extraction details for a record.
+
+        Consecutive records from a device usually contain the same fields. So
+        rather than test each field in each record, the (dest, source) pairs
+        applicable to a record are determined once and saved along with an
+        itemgetter that extracts the source field values in a single call.
+        The saved details are re-used for subsequent records that contain the
+        same fields.
+        """
+
+        # A source field can be mapped only if it exists in the data, so
+        # iterate over whichever of the data or the field map is smaller.
+        # Typically the data contains far fewer fields than the field map.
+        if len(rec) < len(self._map_items):
+            # the data is smaller, use each field in the data that exists in
+            # the field map
+            source_map = self._source_map
+            pairs = tuple((dest, source) for source in rec if source in source_map
+                          for dest in source_map[source])
+        else:
+            # the field map is smaller, use each field in the field map that
+            # exists in the data
+            pairs = tuple((dest, source) for dest, source in self._map_items
+                          if source in rec)
+        dests = tuple(dest for dest, source in pairs)
+        sources = tuple(source for dest, source in pairs)
+        # itemgetter returns a tuple only when given two or more items, so
+        # handle fewer items separately
+        if len(sources) > 1:
+            getter = itemgetter(*sources)
+        elif len(sources) == 1:
+            getter = lambda rec, source=sources[0]: (rec[source],)
+        else:
+            getter = lambda rec: ()
+        # save the details as a single tuple so they are always consistent
+        self._batch = (frozenset(rec.keys()), dests, getter)
 
     def construct_field_map(self, def_map, **config):
         """Construct a field map given a default field map and field map config.
@@ -865,44 +779,28 @@ class FieldMapper:
         """
 
         # Update the default map given the wn32 indoor/outdoor config. First
-        # make sure the default map is an InvertibleMap object.
-        default_map = InvertibleMap(def_map)
-        # do we have an indoor WN32, if so update any WH25 battery and signal
-        # mappings to reflect the WN32
-        if self.wn32_indoor:
-            # we have a WN32 indoor, iterate over the source fields for which
-            # we need to change the mapped dest field
-            for source in ('wh25.battery', 'wh25.signal'):
-                # is the source field in the default map
-                if source in default_map.values():
-                    # the source field is in the default map, obtain the
-                    # current dest field
-                    dest_field = default_map.inverse[source]
-                    # remove the current source field mapping
-                    _ = default_map.pop(dest_field)
-                    # construct the new dest field name, it is a simple
-                    # substitution in the old dest field name
-                    new_dest_field = dest_field.replace('wh25', 'wn32')
-                    # add the new mapping using the new dest field
-                    default_map[new_dest_field] = source
-        # do we have an outdoor WN32 (a WN32P), if so update any WH26 battery
-        # and signal mappings to reflect the WN32P
-        if self.wn32_outdoor:
-            # we have a WN32P outdoor, iterate over the source fields for which
-            # we need to change the mapped dest field
-            for source in ('wh26.battery', 'wh26.signal'):
-                # is the source field in the default map
-                if source in default_map.values():
-                    # the source field is in the default map, obtain the
-                    # current dest field
-                    dest_field = default_map.inverse[source]
-                    # remove the current source field mapping
-                    _ = default_map.pop(dest_field)
-                    # construct the new dest field name, it is a simple
-                    # substitution in the old dest field name
-                    new_dest_field = dest_field.replace('wh26', 'wn32p')
-                    # add the new mapping using the new dest field
-                    default_map[new_dest_field] = source
+        # obtain an InvertibleMap object of the default map that we can
+        # change, if we were given an InvertibleMap we can simply copy it.
+        if isinstance(def_map, InvertibleMap):
+            default_map = def_map.copy()
+        else:
+            default_map = InvertibleMap(def_map)
+        # Depending on our WN32 config some sensor battery and signal state
+        # fields need to be reported against a WN32 rather than a WH25
+        # (indoor) and/or WH26 (outdoor) sensor. Obtain the applicable
+        # renames.
+        renames = ((_WN32_INDOOR_RENAMES if self.wn32_indoor else ())
+                   + (_WN32_OUTDOOR_RENAMES if self.wn32_outdoor else ()))
+        # iterate over the source fields for which we need to change the
+        # mapped dest field
+        for source, old, new in renames:
+            # obtain the current dest field for the source field, will be None
+            # if the source field is not in the default map
+            dest_field = default_map.inverse.get(source)
+            if dest_field is not None:
+                # change the dest field of the mapping, the new dest field
+                # name is a simple substitution in the old dest field name
+                default_map.rekey(dest_field, dest_field.replace(old, new))
         # obtain the map from our config
         field_map = config.get('field_map')
         # if no map was provided use the default
@@ -922,16 +820,16 @@ class FieldMapper:
         extensions = config.get('field_map_extensions', {})
         # we only need process the field_map_extensions if we have any
         if len(extensions) > 0:
-            # first make a copy of the field map because we will be iterating
-            # over it and likely changing it
-            field_map_copy = dict(field_map)
-            # iterate over each key, value pair in the copy of the field map
-            for k, v in field_map_copy.items():
+            # obtain the set of device fields in the field map extensions
+            ext_sources = set(extensions.values())
+            # iterate over a snapshot of the field map key, value pairs
+            # because we will likely be changing the field map as we go
+            for k, v in tuple(field_map.items()):
                 # if the 'value' (ie the device field) is in the field map
                 # extensions we will be mapping that device field elsewhere so
                 # pop that field map entry out of the field map so we don't end
                 # up with multiple mappings for a device field
-                if v in extensions.values():
+                if v in ext_sources:
                     # pop the field map entry
                     _dummy = field_map.pop(k)
             # now we can update the field map with the extensions
@@ -952,17 +850,16 @@ class FieldMapper:
                      mapped to the 'usUnits' field.
         """
 
-        if self.field_map is not None and len(self.field_map) > 0:
+        if self._map_items:
             # we have a field map
 
-            # initialise a empty dict to hold the mapped data
-            mapped_data = {}
-            # iterate over each of the key, value pairs in the field map
-            for dest_field, source_field in self.field_map.items():
-                # if the field to be mapped exists in the data obtain its
-                # value and map it to the packet
-                if source_field in rec:
-                    mapped_data[dest_field] = rec.get(source_field)
+            # if the data does not contain the same fields as the last data
+            # we mapped determine new batch extraction details
+            if rec.keys() != self._batch[0]:
+                self.set_batch(rec)
+            # extract the source field values and map them to the dest fields
+            _, dests, getter = self._batch
+            mapped_data = dict(zip(dests, getter(rec)))
             # now add the unit_system value to field 'usUnits' if it was provided
             if unit_system is not None:
                 mapped_data['usUnits'] = unit_system
@@ -1015,7 +912,7 @@ class HttpMapper(FieldMapper):
         WeeWX field name: Device field name
     """
 
-    # modular observation map
+    # modular observation map, channelised observations are generated
     default_obs_map = {
         'inTemp': 'wh25.intemp',
         'inHumidity': 'wh25.inhumi',
@@ -1033,85 +930,29 @@ class HttpMapper(FieldMapper):
         'lightningdist': 'lightning.distance',
         'lightningdettime': 'lightning.timestamp',
         'lightningcount': 'lightning.count',
-        'extraTemp1': 'ch_aisle.1.temp',
-        'extraHumid1': 'ch_aisle.1.humidity',
-        'extraTemp2': 'ch_aisle.2.temp',
-        'extraHumid2': 'ch_aisle.2.humidity',
-        'extraTemp3': 'ch_aisle.3.temp',
-        'extraHumid3': 'ch_aisle.3.humidity',
-        'extraTemp4': 'ch_aisle.4.temp',
-        'extraHumid4': 'ch_aisle.4.humidity',
-        'extraTemp5': 'ch_aisle.5.temp',
-        'extraHumid5': 'ch_aisle.5.humidity',
-        'extraTemp6': 'ch_aisle.6.temp',
-        'extraHumid6': 'ch_aisle.6.humidity',
-        'extraTemp7': 'ch_aisle.7.temp',
-        'extraHumid7': 'ch_aisle.7.humidity',
-        'extraTemp8': 'ch_aisle.8.temp',
-        'extraHumid8': 'ch_aisle.8.humidity',
-        'extraTemp9': 'ch_temp.1.temp',
-        'extraTemp10': 'ch_temp.2.temp',
-        'extraTemp11': 'ch_temp.3.temp',
-        'extraTemp12': 'ch_temp.4.temp',
-        'extraTemp13': 'ch_temp.5.temp',
-        'extraTemp14': 'ch_temp.6.temp',
-        'extraTemp15': 'ch_temp.7.temp',
-        'extraTemp16': 'ch_temp.8.temp',
+        # WN31 temperature and humidity
+        **{d: s for ch in range(1, 9)
+           for d, s in ((f'extraTemp{ch}', f'ch_aisle.{ch}.temp'),
+                        (f'extraHumid{ch}', f'ch_aisle.{ch}.humidity'))},
+        # WN34 temperature
+        **{f'extraTemp{ch + 8}': f'ch_temp.{ch}.temp' for ch in range(1, 9)},
         'co2': 'co2.CO2',
         'pm2_55': 'co2.PM25',
         'pm10_0': 'co2.PM10',
-        'pm2_5': 'ch_pm25.1.PM25',
-        'pm25_ch1_real': 'ch_pm25.1.PM25_RealAQI',
-        'pm25_ch1_24h': 'ch_pm25.1.PM25_24HAQI',
-        'pm2_52': 'ch_pm25.2.PM25',
-        'pm25_ch2_real': 'ch_pm25.2.PM25_RealAQI',
-        'pm25_ch2_24h': 'ch_pm25.2.PM25_24HAQI',
-        'pm2_53': 'ch_pm25.3.PM25',
-        'pm25_ch3_real': 'ch_pm25.3.PM25_RealAQI',
-        'pm25_ch3_24h': 'ch_pm25.3.PM25_24HAQI',
-        'pm2_54': 'ch_pm25.4.PM25',
-        'pm25_ch4_real': 'ch_pm25.4.PM25_RealAQI',
-        'pm25_ch4_24h': 'ch_pm25.4.PM25_24HAQI',
-        'soilMoist1': 'ch_soil.1.humidity',
-        'soilMoist2': 'ch_soil.2.humidity',
-        'soilMoist3': 'ch_soil.3.humidity',
-        'soilMoist4': 'ch_soil.4.humidity',
-        'soilMoist5': 'ch_soil.5.humidity',
-        'soilMoist6': 'ch_soil.6.humidity',
-        'soilMoist7': 'ch_soil.7.humidity',
-        'soilMoist8': 'ch_soil.8.humidity',
-        'soilMoist9': 'ch_soil.9.humidity',
-        'soilMoist10': 'ch_soil.10.humidity',
-        'soilMoist11': 'ch_soil.11.humidity',
-        'soilMoist12': 'ch_soil.12.humidity',
-        'soilMoist13': 'ch_soil.13.humidity',
-        'soilMoist14': 'ch_soil.14.humidity',
-        'soilMoist15': 'ch_soil.15.humidity',
-        'soilMoist16': 'ch_soil.16.humidity',
-        'leafWet1': 'ch_leaf.1.humidity',
-        'leafWet2': 'ch_leaf.2.humidity',
-        'leafWet3': 'ch_leaf.3.humidity',
-        'leafWet4': 'ch_leaf.4.humidity',
-        'leafWet5': 'ch_leaf.5.humidity',
-        'leafWet6': 'ch_leaf.6.humidity',
-        'leafWet7': 'ch_leaf.7.humidity',
-        'leafWet8': 'ch_leaf.8.humidity',
-        'leak1': 'ch_leak.1.status',
-        'leak2': 'ch_leak.2.status',
-        'leak3': 'ch_leak.3.status',
-        'leak4': 'ch_leak.4.status',
-        'air1': 'ch_lds.1.air',
-        'depth1': 'ch_lds.1.depth',
-        'heat1': 'ch_lds.1.heat',
-        'air2': 'ch_lds.2.air',
-        'depth2': 'ch_lds.2.depth',
-        'heat2': 'ch_lds.2.heat',
-        'air3': 'ch_lds.3.air',
-        'depth3': 'ch_lds.3.depth',
-        'heat3': 'ch_lds.3.heat',
-        'air4': 'ch_lds.4.air',
-        'depth4': 'ch_lds.4.depth',
-        'heat4': 'ch_lds.4.heat',
+        # WH41/WH43 PM2.5, channel 1 PM2.5 is mapped to 'pm2_5'
+        **{d: s for ch in range(1, 5)
+           for d, s in (('pm2_5' if ch == 1 else f'pm2_5{ch}', f'ch_pm25.{ch}.PM25'),
+                        (f'pm25_ch{ch}_real', f'ch_pm25.{ch}.PM25_RealAQI'),
+                        (f'pm25_ch{ch}_24h', f'ch_pm25.{ch}.PM25_24HAQI'))},
+        # WH51 soil moisture
+        **{f'soilMoist{ch}': f'ch_soil.{ch}.humidity' for ch in range(1, 17)},
+        # WN35 leaf wetness
+        **{f'leafWet{ch}': f'ch_leaf.{ch}.humidity' for ch in range(1, 9)},
+        # WH55 leak
+        **{f'leak{ch}': f'ch_leak.{ch}.status' for ch in range(1, 5)},
+        # WH54 lds
+        **{f'{attr}{ch}': f'ch_lds.{ch}.{attr}' for ch in range(1, 5)
+           for attr in ('air', 'depth', 'heat')},
     }
     # modular rain map
     default_rain_map = {
@@ -1138,84 +979,24 @@ class HttpMapper(FieldMapper):
         'windGust': 'common_list.0x0C.val',
         'daymaxwind': 'common_list.0x19.val',
     }
-    # modular sensor state map
+    # modular sensor state map, the regular channelised sensor battery,
+    # voltage and signal fields are generated
     default_sensor_state_map = {
         'wh25_batt': 'wh25.battery',
         'wh25_sig': 'wh25.signal',
         'wh26_batt': 'wh26.battery',
         'wh26_sig': 'wh26.signal',
-        'wn31_ch1_batt': 'wn31.ch1.battery',
-        'wn31_ch1_sig': 'wn31.ch1.signal',
-        'wn31_ch2_batt': 'wn31.ch2.battery',
-        'wn31_ch2_sig': 'wn31.ch2.signal',
-        'wn31_ch3_batt': 'wn31.ch3.battery',
-        'wn31_ch3_sig': 'wn31.ch3.signal',
-        'wn31_ch4_batt': 'wn31.ch4.battery',
-        'wn31_ch4_sig': 'wn31.ch4.signal',
-        'wn31_ch5_batt': 'wn31.ch5.battery',
-        'wn31_ch5_sig': 'wn31.ch5.signal',
-        'wn31_ch6_batt': 'wn31.ch6.battery',
-        'wn31_ch6_sig': 'wn31.ch6.signal',
-        'wn31_ch7_batt': 'wn31.ch7.battery',
-        'wn31_ch7_sig': 'wn31.ch7.signal',
-        'wn31_ch8_batt': 'wn31.ch8.battery',
-        'wn31_ch8_sig': 'wn31.ch8.signal',
-        'wn34_ch1_batt': 'wn34.ch1.battery',
-        'wn34_ch1_volt': 'ch_temp.1.voltage',
-        'wn34_ch1_sig': 'wn34.ch1.signal',
-        'wn34_ch2_batt': 'wn34.ch2.battery',
-        'wn34_ch2_volt': 'ch_temp.2.voltage',
-        'wn34_ch2_sig': 'wn34.ch2.signal',
-        'wn34_ch3_batt': 'wn34.ch3.battery',
-        'wn34_ch3_volt': 'ch_temp.3.voltage',
-        'wn34_ch3_sig': 'wn34.ch3.signal',
-        'wn34_ch4_batt': 'wn34.ch4.battery',
-        'wn34_ch4_volt': 'ch_temp.4.voltage',
-        'wn34_ch4_sig': 'wn34.ch4.signal',
-        'wn34_ch5_batt': 'wn34.ch5.battery',
-        'wn34_ch5_volt': 'ch_temp.5.voltage',
-        'wn34_ch5_sig': 'wn34.ch5.signal',
-        'wn34_ch6_batt': 'wn34.ch6.battery',
-        'wn34_ch6_volt': 'ch_temp.6.voltage',
-        'wn34_ch6_sig': 'wn34.ch6.signal',
-        'wn34_ch7_batt': 'wn34.ch7.battery',
-        'wn34_ch7_volt': 'ch_temp.7.voltage',
-        'wn34_ch7_sig': 'wn34.ch7.signal',
-        'wn34_ch8_batt': 'wn34.ch8.battery',
-        'wn34_ch8_volt': 'ch_temp.8.voltage',
-        'wn34_ch8_sig': 'wn34.ch8.signal',
-        'wh41_ch1_batt': 'wh41.ch1.battery',
-        'wh41_ch1_sig': 'wh41.ch1.signal',
-        'wh41_ch2_batt': 'wh41.ch2.battery',
-        'wh41_ch2_sig': 'wh41.ch2.signal',
-        'wh41_ch3_batt': 'wh41.ch3.battery',
-        'wh41_ch3_sig': 'wh41.ch3.signal',
-        'wh41_ch4_batt': 'wh41.ch4.battery',
-        'wh41_ch4_sig': 'wh41.ch4.signal',
-        'wh51_ch1_batt': 'wh51.ch1.battery',
-        'wh51_ch1_volt': 'ch_soil.1.voltage',
-        'wh51_ch1_sig': 'wh51.ch1.signal',
-        'wh51_ch2_batt': 'wh51.ch2.battery',
-        'wh51_ch2_volt': 'ch_soil.2.voltage',
-        'wh51_ch2_sig': 'wh51.ch2.signal',
-        'wh51_ch3_batt': 'wh51.ch3.battery',
-        'wh51_ch3_volt': 'ch_soil.3.voltage',
-        'wh51_ch3_sig': 'wh51.ch3.signal',
-        'wh51_ch4_batt': 'wh51.ch4.battery',
-        'wh51_ch4_volt': 'ch_soil.4.voltage',
-        'wh51_ch4_sig': 'wh51.ch4.signal',
-        'wh51_ch5_batt': 'wh51.ch5.battery',
-        'wh51_ch5_volt': 'ch_soil.5.voltage',
-        'wh51_ch5_sig': 'wh51.ch5.signal',
-        'wh51_ch6_batt': 'wh51.ch6.battery',
-        'wh51_ch6_volt': 'ch_soil.6.voltage',
-        'wh51_ch6_sig': 'wh51.ch6.signal',
-        'wh51_ch7_batt': 'wh51.ch7.battery',
-        'wh51_ch7_volt': 'ch_soil.7.voltage',
-        'wh51_ch7_sig': 'wh51.ch7.signal',
-        'wh51_ch8_batt': 'wh51.ch8.battery',
-        'wh51_ch8_volt': 'ch_soil.8.voltage',
-        'wh51_ch8_sig': 'wh51.ch8.signal',
+        # WN31, WN34, WH41 and WH51 sensors, format is (sensor, number of
+        # channels, section containing the sensor voltage or None)
+        **{d: s for sensor, channels, volt_section in (('wn31', 8, None),
+                                                       ('wn34', 8, 'ch_temp'),
+                                                       ('wh41', 4, None),
+                                                       ('wh51', 8, 'ch_soil'))
+           for ch in range(1, channels + 1)
+           for d, s in ((f'{sensor}_ch{ch}_batt', f'{sensor}.ch{ch}.battery'),
+                        (f'{sensor}_ch{ch}_volt', f'{volt_section}.{ch}.voltage'),
+                        (f'{sensor}_ch{ch}_sig', f'{sensor}.ch{ch}.signal'))
+           if volt_section is not None or not d.endswith('_volt')},
         'wh54_ch1_batt': 'wh54.ch1.battery',
         'wh54_ch1_volt': 'ch_lds.1.voltage',
         'wh54_ch1_sig': 'wh54.ch1.signal',
@@ -1241,17 +1022,24 @@ class HttpMapper(FieldMapper):
         'ws90_sig': 'ws90.signal'
     }
     # construct the default map based on the modular maps
-    default_map = (dict(default_obs_map))
-    default_map.update(default_rain_map)
-    default_map.update(default_wind_map)
-    default_map.update(default_sensor_state_map)
+    default_map = {**default_obs_map, **default_rain_map,
+                   **default_wind_map, **default_sensor_state_map}
+    # the sets of device fields used for rain and wind, used to construct the
+    # in-use rain and wind maps
+    _rain_sources = frozenset(default_rain_map.values())
+    _wind_sources = frozenset(default_wind_map.values())
+    # an InvertibleMap of the default map, saves constructing the inverse of
+    # the default map each time an HttpMapper object is created
+    _default_invertible_map = InvertibleMap(default_map)
+
+    __slots__ = ('_rain_map', '_wind_map')
 
     def __init__(self, driver_debug=None, default_map=None, **mapper_config):
         """Initialise an HttpMapper object."""
 
         # obtain my base map, if we were passed a default map use it,
         # otherwise fall back to our default_map
-        def_map = default_map if default_map is not None else HttpMapper.default_map
+        def_map = default_map if default_map is not None else HttpMapper._default_invertible_map
         # initialise my parent
         super().__init__(driver_debug=driver_debug,
                          default_map=def_map,
@@ -1260,33 +1048,54 @@ class HttpMapper(FieldMapper):
         # packet field 'dateTime', too many parts of the driver depend on this.
         # So check to ensure this mapping is in place as the user could have
         # removed or altered it. If the mapping is not there add it in.
-        # initialise the key that maps 'datetime'
-        datetime_key = None
-        # iterate over the field map entries
-        for k, v in self.field_map.items():
-            # if the mapping is for 'datetime' save the key and break
-            if v == 'datetime':
-                datetime_key = k
-                break
+        # obtain the key that maps 'datetime', the field map is an
+        # InvertibleMap so we can look it up directly
+        datetime_key = self.field_map.inverse.get('datetime')
         # if we have a mapping for 'datetime' delete that field map entry
         if datetime_key:
             _ = self.field_map.pop(datetime_key)
         # add the required mapping
         self.field_map['dateTime'] = 'datetime'
-        # construct the in-use rain_map
-        self.rain_map = {d: s for d,s in self.field_map.items() if s in self.default_rain_map.values()}
-        # construct the in-use wind_map
-        self.wind_map = {d: s for d,s in self.field_map.items() if s in self.default_wind_map.values()}
+        # we have changed the field map so refresh our field map snapshots
+        self.refresh_map_items()
+        # the in-use rain and wind maps are only constructed if and when they
+        # are used
+        self._rain_map = None
+        self._wind_map = None
         # ensure all destination (WeeWX) fields are assigned a unit group
         self.assign_unit_groups()
         # log our field map if required
-        if getattr(driver_debug, 'any', False) or getattr(driver_debug, 'debug', 0) >= 1 or weewx.debug > 0:
+        if self._debug_any:
             # The field map. Field map dict output will be in unsorted key order.
             # It is easier to read if sorted alphanumerically, but we have keys
             # such as xxxxx16 that do not sort well. Use a custom natural sort of
             # the keys in a manually produced formatted dict representation.
             log.info('     field map is %s' % natural_sort_dict(self.field_map))
 
+    @property
+    def rain_map(self):
+        """The in-use rain map.
+
+        The subset of the field map that maps rain related device fields.
+        Constructed on first use.
+        """
+
+        if self._rain_map is None:
+            self._rain_map = {d: s for d, s in self.field_map.items() if s in self._rain_sources}
+        return self._rain_map
+
+    @property
+    def wind_map(self):
+        """The in-use wind map.
+
+        The subset of the field map that maps wind related device fields.
+        Constructed on first use.
+        """
+
+        if self._wind_map is None:
+            self._wind_map = {d: s for d, s in self.field_map.items() if s in self._wind_sources}
+        return self._wind_map
+
     def assign_unit_groups(self):
         """Assign destination fields to a WeeWX unit group.
 
@@ -1298,16 +1107,18 @@ class HttpMapper(FieldMapper):
         weewx.units.obs_group.dict.
         """
 
+        # obtain a local reference to the WeeWX obs_group_dict
+        obs_group_dict = weewx.units.obs_group_dict
         # iterate over the destination (WeeWX) obs and source (Ecowitt) field
         # pairs in our map
         for w_field, e_field in self.field_map.items():
             # is there an existing entry for the WeeWX field in the
             # obs_group_dict
-            if w_field not in weewx.units.obs_group_dict.keys():
+            if w_field not in obs_group_dict:
                 # the WeeWX field is not in the obs_group_dict so add an entry
                 # for the WeeWX field using the group previously assigned to
                 # the source Ecowitt field
-                weewx.units.obs_group_dict[w_field] = DEFAULT_GROUPS[e_field]
+                obs_group_dict[w_field] = default_group(e_field)
 
 
 # ============================================================================
@@ -1461,15 +1272,114 @@ class SdMapper(FieldMapper):
         'ch_lds.4.heat': 'LDS_Heat CH4'
     }
 
+    # an InvertibleMap of the default map, saves constructing the inverse of
+    # the default map each time an SdMapper object is created
+    _default_invertible_map = InvertibleMap(default_map)
+
+    __slots__ = ('_sd_fields', '_sd_dest_table')
+
     def __init__(self, driver_debug=None, default_map=None, **mapper_config):
 
         # obtain the default map to be used
-        def_map = default_map if default_map is not None else SdMapper.default_map
+        def_map = default_map if default_map is not None else SdMapper._default_invertible_map
         # initialise my super class
         super().__init__(driver_debug=driver_debug,
                          default_map=def_map,
                          **mapper_config)
 
+    def refresh_map_items(self):
+        """Refresh the field map snapshots and discard the dest field table.
+
+        In addition to the snapshots kept by FieldMapper, SdMapper keeps a
+        table of the destination field for each mappable history file field.
+        The table may no longer reflect the field map so discard it.
+        """
+
+        # refresh the FieldMapper snapshots
+        super().refresh_map_items()
+        # discard the field names and destination field table
+        self._sd_fields = None
+        self._sd_dest_table = {}
+
+    def set_dest_table(self, rec):
+        """Determine the destination field table for a history file record.
+
+        Every record in a history file has the same field names, so rather
+        than strip the unit information from, and look up, each field in each
+        record, the destination field for each mappable field is determined
+        once and saved in a dict keyed by history file field name. The saved
+        table is re-used for subsequent records that contain the same fields.
+        """
+
+        # initialise an empty dict to hold the destination field table
+        dest_table = {}
+        # iterate over the source data keys
+        for field in rec.keys():
+            # strip the units information from the key and look up the
+            # destination field using the sanitised key
+            dest_field = self.field_map.inverse.get(self.strip_units(field))
+            # if no mapping exists for this source field log it and continue
+            if dest_field is None:
+                if self.driver_debug.catchup:
+                    log.info("Error mapping field '%s': no mapping exists", field)
+                continue
+            # save the destination field
+            dest_table[field] = dest_field
+        # save the field names and destination field table
+        self._sd_fields = frozenset(rec.keys())
+        self._sd_dest_table = dest_table
+
+    @staticmethod
+    def strip_units(field):
+        """Strip bracketed unit information from a history file field name.
+
+        Removes each bracketed sub-string, eg '(°C)', from a field name. Each
+        bracketed sub-string extends from a '(' to the next ')'. The field
+        name is scanned once using str.find() rather than using a regular
+        expression, most field names contain no more than one bracketed
+        sub-string.
+
+        Returns the field name with any bracketed sub-strings removed.
+        """
+
+        # find the first '(', if there is none there is nothing to remove
+        idx = field.find('(')
+        if idx < 0:
+            return field
+        # initialise a list to hold the parts of the field name we keep
+        parts = []
+        # where the next part we keep starts
+        start = 0
+        while idx >= 0:
+            # find the closing ')', if there is none we are done
+            end = field.find(')', idx)
+            if end < 0:
+                break
+            # keep everything from the end of the previous bracketed
+            # sub-string to the start of this one
+            parts.append(field[start:idx])
+            # move on to the next '('
+            start = end + 1
+            idx = field.find('(', start)
+        # keep whatever remains
+        parts.append(field[start:])
+        return ''.join(parts)
+
+    @staticmethod
+    def safe_float(value):
+        """Convert a history file field value to a float.
+
+        Returns the value as a float or None if the value cannot be converted
+        to a float.
+        """
+
+        # try to convert the value, but be prepared to catch any
+        # exceptions
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
     def map_data(self, rec, unit_system=None):
         """Map a packet of data according to the field map.
 
@@ -1497,25 +1407,45 @@ class SdMapper(FieldMapper):
         """
 
         # we can only map data if we have a field map
-        if self.field_map is not None and len(self.field_map) > 0:
+        if self.field_map:
             # we have a field map
-            # initialise an empty dict to hold the mapped data
+            # obtain the destination field table, it need only be determined
+            # again if the source data fields have changed
+            if rec.keys() != self._sd_fields:
+                self.set_dest_table(rec)
+            # usually every mappable source field can be converted to a float,
+            # so try to construct the mapped data in one go
+            try:
+                return {dest_field: float(rec[field])
+                        for field, dest_field in self._sd_dest_table.items()}
+            except (TypeError, ValueError):
+                # one or more source fields could not be converted to a float
+                pass
+            # our catchup debug setting does not change, obtain it once
+            # rather than for each field that cannot be mapped
+            debug_catchup = self.driver_debug.catchup
+            # if we are not logging fields that cannot be mapped, construct
+            # the mapped data in one go omitting any source fields that could
+            # not be converted to a float
+            if not debug_catchup:
+                values = ((dest_field, self.safe_float(rec[field]))
+                          for field, dest_field in self._sd_dest_table.items())
+                return {dest_field: value
+                        for dest_field, value in values if value is not None}
+            # otherwise map the source data field by field, initialise an
+            # empty dict to hold the mapped data
             mapped_rec = {}
-            # iterate over the source data keys
-            for field in rec.keys():
-                # strip the units information from the key
-                clean_key = re.sub("\(.*?\)","", field)
-                # now try to map the source data using the sanitised key, but
-                # be prepared to catch any one of a number of exceptions
+            # iterate over the mappable source fields
+            for field, dest_field in self._sd_dest_table.items():
+                # try to map the source data, but be prepared to catch any
+                # exceptions
                 try:
-                    dest_field = self.field_map.inverse[clean_key]
                     mapped_rec[dest_field] = float(rec[field])
-                except (KeyError, TypeError, ValueError) as e:
-                    # KeyError indicates no mapping exists for this source
-                    # field, TypeError and ValueError indicate the source data
-                    # could not be converted to a float. In either case log it,
-                    # ignore this field and continue.
-                    if self.driver_debug.catchup:
+                except (TypeError, ValueError) as e:
+                    # TypeError and ValueError indicate the source data could
+                    # not be converted to a float, log it, ignore this field
+                    # and continue
+                    if debug_catchup:
                         log.info("Error mapping field '%s': %s", field, e)
                     continue
             # return the mapped data
@@ -1538,6 +1468,9 @@ class EcowittCommon:
     features.
     """
 
+    # whether our collector keeps only the latest sensor data
+    collector_latest_data_only = False
+
     def __init__(self, unit_system=None, **ec_config):
         """Initialise an EcowittCommon object."""
 
@@ -1545,6 +1478,12 @@ class EcowittCommon:
         self.driver_debug = DebugOptions(**ec_config)
         # obtain a HttpMapper object to do our field mapping
         self.mapper = HttpMapper(driver_debug=self.driver_debug, **ec_config)
+        # The rain and wind maps do not change once our mapper has been
+        # created, so the ('WeeWX' field, 'device' field) pairs of each can be
+        # saved for use when logging rain and wind data. They are only needed
+        # if rain or wind data is logged, so they are obtained on first use.
+        self._rain_map_items = None
+        self._wind_map_items = None
         # obtain and save the socket timeout to be used
         max_tries = weeutil.weeutil.to_int(ec_config.get('max_tries',
                                                          DEFAULT_MAX_TRIES))
@@ -1582,30 +1521,22 @@ class EcowittCommon:
         # EcowittHttpCollector object may fail due to connectivity issues, this
         # way we at least log our config which may aid debugging.
 
-        log.info('     device IP address is %s' % self.ip_address)
-        log.info('     poll interval is %d seconds' % self.poll_interval)
+        log.info('     device IP address is %s', self.ip_address)
+        log.info('     poll interval is %d seconds', self.poll_interval)
         if self.driver_debug.any or weewx.debug > 0:
             log.info('     Max tries is %d URL retry wait is %d seconds', max_tries, retry_wait)
             log.info('     URL timeout is %d seconds', self.url_timeout)
 
         # log specific debug output but only if set
-        debug_list = []
-        if self.driver_debug.rain:
-            debug_list.append(f"rain debug is {self.driver_debug.rain}")
-        if self.driver_debug.wind:
-            debug_list.append(f"wind debug is {self.driver_debug.wind}")
-        if self.driver_debug.loop:
-            debug_list.append(f"loop debug is {self.driver_debug.loop}")
-        if len(debug_list) > 0:
-            log.info(' '.join(debug_list))
-        debug_list = []
-        if self.driver_debug.sensors:
-            debug_list.append(f"sensors debug is {self.driver_debug.rain}")
-        if self.driver_debug.catchup:
-            debug_list.append(f"catchup debug is {self.driver_debug.wind}")
-        if self.driver_debug.parser:
-            debug_list.append(f"parser debug is {self.driver_debug.loop}")
-        if len(debug_list) > 0:
+        debug_list = [f"{name} debug is {value}"
+                      for name, value in (('rain', self.driver_debug.rain),
+                                          ('wind', self.driver_debug.wind),
+                                          ('loop', self.driver_debug.loop),
+                                          ('sensors', self.driver_debug.sensors),
+                                          ('catchup', self.driver_debug.catchup),
+                                          ('parser', self.driver_debug.parser))
+                      if value]
+        if debug_list:
             log.info(' '.join(debug_list))
         if self.mapper.wn32_indoor:
             log.debug("     sensor ID decoding will use indoor 'WN32'")
@@ -1627,6 +1558,7 @@ class EcowittCommon:
                                               show_battery=show_battery,
                                               log_unknown_fields=log_unknown_fields,
                                               fw_update_check_interval=fw_update_check_interval,
+                                              latest_data_only=self.collector_latest_data_only,
                                               debug=self.driver_debug)
         self.last_lightning = None
         self.last_rain = None
@@ -1651,25 +1583,32 @@ class EcowittCommon:
         This combined field list is then used to log any rain related fields.
         """
 
-        msg_list = []
-        # iterate over our rain_map keys (the 'WeeWX' fields) and values (the
-        # 'device' fields) we are interested in
-        for weewx_field, gw_field in self.mapper.rain_map.items():
-            # do we have a 'WeeWX' field of interest
-            if weewx_field in data:
-                # we do so add some formatted output to our list
-                msg_list.append(f"{weewx_field}={data[weewx_field]}")
-            # do we have a 'device' field of interest
-            if gw_field in data and weewx_field != gw_field:
-                # we do so add some formatted output to our list
-                msg_list.append(f"{gw_field}={data[gw_field]}")
+        # there is nothing to do if INFO level log output is not being
+        # emitted
+        if not log.isEnabledFor(logging.INFO):
+            return
+        # obtain our rain map pairs, if this is our first use obtain and save
+        # them
+        rain_map_items = self._rain_map_items
+        if rain_map_items is None:
+            rain_map_items = self._rain_map_items = tuple(self.mapper.rain_map.items())
+        # obtain formatted output for any 'WeeWX' fields of interest, these
+        # are the keys of our rain map
+        msg_list = [f"{weewx_field}={data[weewx_field]}"
+                    for weewx_field, gw_field in rain_map_items
+                    if weewx_field in data]
+        # add formatted output for any 'device' fields of interest, these are
+        # the values of our rain map
+        msg_list += [f"{gw_field}={data[gw_field]}"
+                     for weewx_field, gw_field in rain_map_items
+                     if gw_field in data and weewx_field != gw_field]
         # pre-format the log line label
         label = f'{preamble}: ' if preamble is not None else ''
         # if we have some entries log them otherwise provide suitable text
-        if len(msg_list) > 0:
-            log.info('%s%s' % (label, ' '.join(msg_list)))
+        if msg_list:
+            log.info('%s%s', label, ' '.join(msg_list))
         else:
-            log.info('%sno rain data found' % (label,))
+            log.info('%sno rain data found', label)
 
     def log_wind_data(self, data, preamble=None):
         """Log wind related data from the collector.
@@ -1681,25 +1620,32 @@ class EcowittCommon:
         ('device' field names) of the rain field map.
         """
 
-        msg_list = []
-        # iterate over our wind_map keys (the 'WeeWX' fields) and values
-        # (the 'device' fields) we are interested in
-        for weewx_field, gw_field in self.mapper.wind_map.items():
-            # do we have a 'WeeWX' field of interest
-            if weewx_field in data:
-                # we do so add some formatted output to our list
-                msg_list.append(f"{weewx_field}={data[weewx_field]}")
-            # do we have a 'device' field of interest
-            if gw_field in data:
-                # we do so add some formatted output to our list
-                msg_list.append(f"{gw_field}={data[gw_field]}")
+        # there is nothing to do if INFO level log output is not being
+        # emitted
+        if not log.isEnabledFor(logging.INFO):
+            return
+        # obtain our wind map pairs, if this is our first use obtain and save
+        # them
+        wind_map_items = self._wind_map_items
+        if wind_map_items is None:
+            wind_map_items = self._wind_map_items = tuple(self.mapper.wind_map.items())
+        # obtain formatted output for any 'WeeWX' fields of interest, these
+        # are the keys of our wind map
+        msg_list = [f"{weewx_field}={data[weewx_field]}"
+                    for weewx_field, gw_field in wind_map_items
+                    if weewx_field in data]
+        # add formatted output for any 'device' fields of interest, these are
+        # the values of our wind map
+        msg_list += [f"{gw_field}={data[gw_field]}"
+                     for weewx_field, gw_field in wind_map_items
+                     if gw_field in data]
         # pre-format the log line label
         label = f"{preamble}: " if preamble is not None else ""
         # if we have some entries log them otherwise provide suitable text
-        if len(msg_list) > 0:
-            log.info('%s%s' % (label, ' '.join(msg_list)))
+        if msg_list:
+            log.info('%s%s', label, ' '.join(msg_list))
         else:
-            log.info('%sno wind data found' % (label,))
+            log.info('%sno wind data found', label)
 
 
 # ============================================================================
@@ -1725,6 +1671,11 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
     parse data from the API.
     """
 
+    # When a loop packet arrives only the newest sensor data packet is used,
+    # so the collector need only keep the latest sensor data. Control data, eg
+    # exceptions, is still queued.
+    collector_latest_data_only = True
+
     def __init__(self, engine, config_dict):
         """Initialise an EcowittHttpService object."""
 
@@ -1744,7 +1695,7 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         # first will aid in remote debugging.
 
         # log our version number
-        log.info('EcowittHttpService: version is %s' % DRIVER_VERSION)
+        log.info('EcowittHttpService: version is %s', DRIVER_VERSION)
         # set the unit system we will emit
         self.unit_system = DEFAULT_UNIT_SYSTEM
         # initialize my superclasses, we need to do this manually due to
@@ -1765,17 +1716,22 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         self.lost_contact_log_period = int(gw_config_dict.get('lost_contact_log_period',
                                                               DEFAULT_LOST_CONTACT_LOG_PERIOD))
         if self.driver_debug.any or weewx.debug > 0:
-            log.info('     max age of API data to be used is %d seconds' % self.max_age)
+            log.info('     max age of API data to be used is %d seconds', self.max_age)
             log.info('     lost contact will be logged every '
-                     '%d seconds' % self.lost_contact_log_period)
+                     '%d seconds', self.lost_contact_log_period)
 
+        # Our debug settings and the WeeWX debug level do not change, so
+        # determine once whether loop debug or the WeeWX debug level requires
+        # detailed logging of loop packet processing.
+        self._debug_loop_detail = self.driver_debug.loop or weewx.debug >= 2
         # set failure logging on
         self.log_failures = True
         # reset the lost contact timestamp
         self.lost_con_ts = None
         # create a placeholder for our most recent, non-stale queued device
-        # sensor data packet
+        # sensor data packet and its timestamp
         self.latest_sensor_data = None
+        self.latest_sensor_ts = float('-inf')
         # start the Gw1000Collector in its own thread
         self.collector.startup()
         # bind our self to the relevant WeeWX events
@@ -1795,110 +1751,102 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         processed as well.
         """
 
+        # Our debug settings do not change, so obtain them once. All of our
+        # debug output is logged at the INFO level, so if INFO level log
+        # output is not being emitted treat our debug settings as off and
+        # avoid formatting (and sorting) debug output that will be discarded.
+        log_info = log.isEnabledFor(logging.INFO)
+        debug_loop = log_info and self.driver_debug.loop
+        debug_rain = log_info and self.driver_debug.rain
+        debug_wind = log_info and self.driver_debug.wind
+        debug_any = debug_loop or debug_rain or debug_wind
         # log the loop packet received if necessary, there are several debug
         # settings that may require this
-        if self.driver_debug.loop or self.driver_debug.rain or self.driver_debug.wind:
-            log.info('EcowittHttpService: Processing loop packet: %s %s' % (timestamp_to_string(event.packet['dateTime']),
-                                                                            natural_sort_dict(event.packet)))
+        if debug_any:
+            log.info('EcowittHttpService: Processing loop packet: %s %s',
+                     timestamp_to_string(event.packet['dateTime']),
+                     LazyNaturalSortDict(event.packet))
         # we are about to process the queue so reset our latest sensor data
-        # packet property
+        # packet property and its timestamp
         self.latest_sensor_data = None
-        # now process the queue until it is empty
-        while True:
-            # Get the next item from the queue. Wrap in a try to catch any
-            # instances where the queue is empty as that is our signal to break
-            # out of the while loop.
-            try:
-                # get the next item from the collector queue, but don't dwell
-                # very long
-                queue_data = self.collector.queue.get(True, 0.5)
-            except queue.Empty:
-                # the queue is now empty, but that may be because we have
-                # already processed any queued data, log if necessary and break
-                # out of the while loop
-                if self.latest_sensor_data is None and (self.driver_debug.loop or self.driver_debug.rain or self.driver_debug.wind):
-                    log.info('EcowittHttpService: No queued items to process')
-                if self.lost_con_ts is not None and time.time() > self.lost_con_ts + self.lost_contact_log_period:
-                    self.lost_con_ts = time.time()
-                    self.set_failure_logging(True)
-                # now break out of the while loop
-                break
-            else:
-                # We received something in the queue, it will be one of three
-                # things:
-                # 1. a dict containing sensor data
-                # 2. an exception
-                # 3. the value None signalling a serious error that means the
-                #    Collector needs to shut down
-
-                # if the data has a 'keys' attribute it is a dict so must be
-                # data
-                if hasattr(queue_data, 'keys'):
-                    # we have a dict so assume it is data
-                    self.lost_con_ts = None
-                    self.set_failure_logging(True)
-                    # log the received data if necessary, there are several
-                    # debug settings that may require this, start from the
-                    # highest (most encompassing) and work to the lowest (least
-                    # encompassing)
-                    if self.driver_debug.loop:
-                        if 'datetime' in queue_data:
-                            # if we have a 'datetime' field it is almost
-                            # certainly a sensor data packet
-                            log.info('EcowittHttpService: Received queued sensor '
-                                     'data: %s %s' % (timestamp_to_string(queue_data['datetime']),
-                                                      natural_sort_dict(queue_data)))
-                        else:
-                            # There is no 'datetime' field, this should not
-                            # happen. Log it in any case.
-                            log.info('EcowittHttpService: Received queued data: %s' % (natural_sort_dict(queue_data),))
+        self.latest_sensor_ts = float('-inf')
+        # Obtain everything in the queue in one go. Any queued items are
+        # obtained without waiting, we only wait (but not for long) if the
+        # queue is empty.
+        queued_items = self.collector.drain_queue(0.5)
+        # obtain the current time once for use when processing the queued
+        # items
+        now = time.time()
+        # sensor data timestamped at or before this time is stale, obtain it
+        # once rather than for each queued item
+        stale_ts = event.packet['dateTime'] - self.max_age
+        # bind the sensor data processing method once rather than for each
+        # queued item
+        process_sensor_data = self.process_queued_sensor_data
+        # now process the queued items, oldest first
+        for queue_data in queued_items:
+            # We received something in the queue, it will be one of three
+            # things:
+            # 1. a dict containing sensor data
+            # 2. an exception
+            # 3. the value None signalling a serious error that means the
+            #    Collector needs to shut down
+
+            # the collector queues sensor data as a dict, a type identity
+            # check is the cheapest way to identify it
+            if type(queue_data) is dict:
+                # we have a dict so assume it is data
+                self.lost_con_ts = None
+                self.set_failure_logging(True)
+                # log the received data if necessary, there are several
+                # debug settings that may require this, start from the
+                # highest (most encompassing) and work to the lowest (least
+                # encompassing)
+                if debug_loop:
+                    if 'datetime' in queue_data:
+                        # if we have a 'datetime' field it is almost
+                        # certainly a sensor data packet
+                        log.info('EcowittHttpService: Received queued sensor '
+                                 'data: %s %s',
+                                 timestamp_to_string(queue_data['datetime']),
+                                 LazyNaturalSortDict(queue_data))
                     else:
-                        # perhaps we have individual debugs such as rain or wind
-                        if self.driver_debug.rain:
-                            # debug_rain is set so log the 'rain' field in the
-                            # mapped data, if it does not exist say so
-                            self.log_rain_data(queue_data,
-                                               f'EcowittHttpService: Received {self.collector.device.model} data')
-                        if self.driver_debug.wind:
-                            # debug_wind is set so log the 'wind' fields in the
-                            # received data, if they do not exist say so
-                            self.log_wind_data(queue_data,
-                                               f'EcowittHttpService: Received {self.collector.device.model} data')
-                    # now process the just received sensor data packet
-                    self.process_queued_sensor_data(queue_data, event.packet['dateTime'])
-
-                # if it's a tuple then it's a tuple with an exception and
-                # exception text
-                elif isinstance(queue_data, BaseException):
-                    # We have an exception. The collector did not deem it
-                    # serious enough to want to shut down, or it would have
-                    # sent None instead. The action we take depends on the type
-                    # of exception it is. If it's a DeviceIOError we can ignore
-                    # it as appropriate action will have been taken by the
-                    # EcowittHttpCollector. If it is anything else we log it.
-                    # process the exception
-                    self.process_queued_exception(queue_data)
-
-                # if it's None then it's a signal the Collector needs to shut down
-                elif queue_data is None:
-                    # if debug_loop log what we received
-                    if self.driver_debug.loop:
-                        log.info('EcowittHttpService: Received collector shutdown signal')
-                    # we received the signal that the EcowittHttpCollector
-                    # needs to shut down, that means we cannot continue so call
-                    # our shutdown method which will also shut down the
-                    # EcowittHttpCollector thread
-                    self.shutDown()
-                    # the EcowittHttpCollector has been shut down, so we will
-                    # not see anything more in the queue. We are still bound to
-                    # NEW_LOOP_PACKET but since the queue is always empty we
-                    # will just wait for the empty queue timeout before exiting
-
-                # if it's none of the above (which it should never be) we don't
-                # know what to do with it so pass and wait for the next item in
-                # the queue
+                        # There is no 'datetime' field, this should not
+                        # happen. Log it in any case.
+                        log.info('EcowittHttpService: Received queued data: %s',
+                                 LazyNaturalSortDict(queue_data))
                 else:
-                    pass
+                    # perhaps we have individual debugs such as rain or wind
+                    if debug_rain:
+                        # debug_rain is set so log the 'rain' field in the
+                        # mapped data, if it does not exist say so
+                        self.log_rain_data(queue_data,
+                                           f'EcowittHttpService: Received {self.collector.device.model} data')
+                    if debug_wind:
+                        # debug_wind is set so log the 'wind' fields in the
+                        # received data, if they do not exist say so
+                        self.log_wind_data(queue_data,
+                                           f'EcowittHttpService: Received {self.collector.device.model} data')
+                # now process the just received sensor data packet
+                process_sensor_data(queue_data, stale_ts)
+
+            # anything else is control data, eg an exception or the collector
+            # shutdown signal, which occurs rarely so is processed separately
+            else:
+                self.process_queued_control_data(queue_data, now)
+
+        # the queue is now empty, but that may be because we have already
+        # processed any queued data, log if necessary
+        if self.latest_sensor_data is None and debug_any:
+            log.info('EcowittHttpService: No queued items to process')
+        # If we have lost contact with the device log it every so often. Rather
+        # than briefly turning failure logging back on, which would be turned
+        # off again on the next queued exception, log a single line and leave
+        # failure logging off.
+        if self.lost_con_ts is not None and now > self.lost_con_ts + self.lost_contact_log_period:
+            self.lost_con_ts = now
+            log.error('EcowittHttpService: Still unable to contact device at %s',
+                      self.ip_address)
 
         # we have now finished processing the queue, do we have a sensor data
         # packet to add to the loop packet
@@ -1909,17 +1857,18 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
             # add 'usUnits' to the packet
             mapped_data['usUnits'] = self.unit_system
             # log the mapped data if necessary
-            if self.driver_debug.loop:
-                log.info('EcowittHttpService: Mapped %s data: %s' % (self.collector.device.model,
-                                                                     natural_sort_dict(mapped_data)))
+            if debug_loop:
+                log.info('EcowittHttpService: Mapped %s data: %s',
+                         self.collector.device.model,
+                         LazyNaturalSortDict(mapped_data))
             else:
                 # perhaps we have individual debugs such as rain or wind
-                if self.driver_debug.rain:
+                if debug_rain:
                     # debug_rain is set so log the 'rain' field in the
                     # mapped data, if it does not exist say so
                     self.log_rain_data(mapped_data,
                                        f'EcowittHttpService: Mapped {self.collector.device.model} data')
-                if self.driver_debug.wind:
+                if debug_wind:
                     # debug_wind is set so log the 'wind' fields in the
                     # mapped data, if they do not exist say so
                     self.log_wind_data(mapped_data,
@@ -1929,23 +1878,24 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
             # log the augmented packet if necessary, there are several debug
             # settings that may require this, start from the highest (most
             # encompassing) and work to the lowest (least encompassing)
-            if self.driver_debug.loop or weewx.debug >= 2:
-                log.info('EcowittHttpService: Augmented packet: %s %s' % (timestamp_to_string(event.packet['dateTime']),
-                                                                          natural_sort_dict(event.packet)))
+            if log_info and self._debug_loop_detail:
+                log.info('EcowittHttpService: Augmented packet: %s %s',
+                         timestamp_to_string(event.packet['dateTime']),
+                         LazyNaturalSortDict(event.packet))
             else:
                 # perhaps we have individual debugs such as rain or wind
-                if self.driver_debug.rain:
+                if debug_rain:
                     # debug_rain is set so log the 'rain' field in the
                     # augmented loop packet, if it does not exist say
                     # so
                     self.log_rain_data(event.packet, 'EcowittHttpService: Augmented packet')
-                if self.driver_debug.wind:
+                if debug_wind:
                     # debug_wind is set so log the 'wind' fields in the
                     # loop packet being emitted, if they do not exist
                     # say so
                     self.log_wind_data(event.packet, 'EcowittHttpService: Augmented packet')
 
-    def process_queued_sensor_data(self, sensor_data, date_time):
+    def process_queued_sensor_data(self, sensor_data, stale_ts):
         """Process a sensor data packet received in the collector queue.
 
         When the queue is processed there may be multiple sensor data packets
@@ -1956,31 +1906,86 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
 
         Non-timestamped sensor data packets are discarded.
 
+        The collector creates a new sensor data packet for each poll of the
+        device and does not change a packet once it has been queued, so the
+        packet is saved as is rather than being copied.
+
         sensor_data: the sensor data packet obtained from the queue
-        date_time:   the timestamp of the current loop packet
-        """
-
-        # first up check we have a field 'datetime' and that it is not None
-        if 'datetime' in sensor_data and sensor_data['datetime'] is not None:
-            # now check it is not stale
-            if sensor_data['datetime'] > date_time - self.max_age:
-                # the sensor data is not stale, but is it more recent than our
-                # current saved packet
-                if self.latest_sensor_data is None or sensor_data['datetime'] > self.latest_sensor_data['datetime']:
-                    # this packet is newer, so keep it
-                    self.latest_sensor_data = dict(sensor_data)
-            elif self.driver_debug.loop or weewx.debug >= 2:
-                # the sensor data is stale and we have debug settings that
-                # dictate we log the discard
-                log.info('EcowittHttpService: Discarded packet with '
-                         'timestamp %s' % timestamp_to_string(sensor_data['datetime']))
-        elif self.driver_debug.loop or weewx.debug >= 2:
-            # the sensor data is not timestamped so it will be discarded and we
-            # have debug settings that dictate we log the discard
-            log.info('EcowittHttpService: Discarded non-timestamped packet')
-
-    def process_queued_exception(self, e):
-        """Process an exception received in the collector queue."""
+        stale_ts:    the timestamp at or before which sensor data is considered
+                     stale
+        """
+
+        # whether we are to log discarded packets
+        log_discards = self._debug_loop_detail and log.isEnabledFor(logging.INFO)
+        # first up obtain the packet timestamp
+        ts = sensor_data.get('datetime')
+        # if the sensor data is not timestamped it will be discarded
+        if ts is None:
+            # log the discard if we have debug settings that dictate we do so
+            if log_discards:
+                log.info('EcowittHttpService: Discarded non-timestamped packet')
+            return
+        # Queued packets are almost always in timestamp order, so usually each
+        # packet is newer than our current saved packet. But if the packet is
+        # not newer it is of no use to us.
+        if ts <= self.latest_sensor_ts:
+            return
+        # now check it is not stale
+        if ts > stale_ts:
+            # the sensor data is not stale and is newer than our current
+            # saved packet, so keep it
+            self.latest_sensor_data = sensor_data
+            self.latest_sensor_ts = ts
+        elif log_discards:
+            # the sensor data is stale and we have debug settings that dictate
+            # we log the discard
+            log.info('EcowittHttpService: Discarded packet with '
+                     'timestamp %s', timestamp_to_string(ts))
+
+    def process_queued_control_data(self, control_data, now):
+        """Process control data received in the collector queue.
+
+        Other than sensor data packets the collector queue may contain an
+        exception or the value None signalling a serious error that means the
+        collector needs to shut down. This control data occurs rarely, so it
+        is processed here rather than in the new_loop_packet() queue loop.
+
+        control_data: the control data obtained from the queue
+        now:          the current time as an epoch timestamp
+        """
+
+        # if it's an exception process the exception
+        if isinstance(control_data, BaseException):
+            # We have an exception. The collector did not deem it serious
+            # enough to want to shut down, or it would have sent None instead.
+            # The action we take depends on the type of exception it is. If
+            # it's a DeviceIOError we can ignore it as appropriate action will
+            # have been taken by the EcowittHttpCollector. If it is anything
+            # else we log it.
+            self.process_queued_exception(control_data, now)
+        # if it's None then it's a signal the Collector needs to shut down
+        elif control_data is None:
+            # if debug_loop log what we received
+            if self.driver_debug.loop:
+                log.info('EcowittHttpService: Received collector shutdown signal')
+            # we received the signal that the EcowittHttpCollector needs to
+            # shut down, that means we cannot continue so call our shutdown
+            # method which will also shut down the EcowittHttpCollector thread
+            self.shutDown()
+            # the EcowittHttpCollector has been shut down, so we will not see
+            # anything more in the queue. We are still bound to NEW_LOOP_PACKET
+            # but since the queue is always empty we will just wait for the
+            # empty queue timeout each time
+        # if it's none of the above (which it should never be) we don't know
+        # what to do with it so ignore it
+
+    def process_queued_exception(self, e, now=None):
+        """Process an exception received in the collector queue.
+
+        e:   the exception obtained from the queue
+        now: optional current time as an epoch timestamp, if not provided the
+             current system time is used
+        """
 
         # is it a DeviceIOError
         if isinstance(e, DeviceIOError):
@@ -1988,20 +1993,18 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
             if self.lost_con_ts is None:
                 # we have previously been in contact with the device so set our
                 # lost contact timestamp
-                self.lost_con_ts = time.time()
+                self.lost_con_ts = now if now is not None else time.time()
                 # any failure logging for this failure will already have
                 # occurred in our EcowittHttpCollector object and its
                 # EcowittDevice object, so turn off failure logging
                 self.set_failure_logging(False)
-            elif self.log_failures:
-                # we are already in a lost contact state, but failure logging
-                # may have been turned on for a 'once in a while' log entry so
-                # we need to turn it off again
-                self.set_failure_logging(False)
+            # otherwise we are already in a lost contact state with failure
+            # logging off, periodic lost contact logging is handled by
+            # new_loop_packet()
         else:
             # it's not so log it
-            log.error('EcowittHttpService: Caught unexpected exception %s: %s' % (e.__class__.__name__,
-                                                                                  e))
+            log.error('EcowittHttpService: Caught unexpected exception %s: %s',
+                      e.__class__.__name__, e)
 
     def augment_packet(self, packet, data):
         """Augment a loop packet with data from another packet.
@@ -2016,7 +2019,11 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         data:   dict containing the data to be used to augment the loop packet
         """
 
-        if self.driver_debug.loop:
+        # our loop debug setting does not change, so obtain it once, there is
+        # no need to format debug output if INFO level output is not being
+        # emitted
+        debug_loop = self.driver_debug.loop and log.isEnabledFor(logging.INFO)
+        if debug_loop:
             log.info('EcowittHttpService: Mapped data will be used to augment loop packet(%s)',
                      timestamp_to_string(packet['dateTime']))
         # But the mapped data must be converted to the same unit system as
@@ -2026,18 +2033,16 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         # be augmented
         converted_data = converter.convertDict(data)
         # if required log the converted data
-        if self.driver_debug.loop:
+        if debug_loop:
             log.info('EcowittHttpService: Converted %s data: %s',
                      self.collector.device.model,
-                     natural_sort_dict(converted_data))
-        # now we can freely augment the packet with any of our mapped obs
-        for field, field_data in converted_data.items():
-            # Any existing packet fields, whether they contain data or are
-            # None, are respected and left alone. Only fields from the
-            # converted data that do not already exist in the packet are
-            # used to augment the packet.
-            if field not in packet:
-                packet[field] = field_data
+                     LazyNaturalSortDict(converted_data))
+        # Now we can freely augment the packet with any of our mapped obs. Any
+        # existing packet fields, whether they contain data or are None, are
+        # respected and left alone. Only fields from the converted data that
+        # do not already exist in the packet are used to augment the packet.
+        packet.update({field: field_data for field, field_data in converted_data.items()
+                       if field not in packet})
 
     # TODO. Why have this, isn't failure_logging passed through each instantiation
     def set_failure_logging(self, log_failures):
@@ -2051,9 +2056,14 @@ class EcowittHttpService(weewx.engine.StdService, EcowittCommon):
         3. in the EcowittHttpCollector object's Station object
 
         Failure logging is turned on or off by setting the log_failures
-        property True or False for each of the above 3 objects.
+        property True or False for each of the above 3 objects. The objects
+        are only changed if failure logging is actually being turned on or
+        off.
         """
 
+        # if failure logging is already as required there is nothing to do
+        if log_failures == self.log_failures:
+            return
         self.log_failures = log_failures
         self.collector.log_failures = log_failures
         self.collector.device.log_failures = log_failures
@@ -2087,329 +2097,136 @@ def confeditor_loader():
 #                     class EcowittHttpDriverConfEditor
 # ============================================================================
 
+# Sensors with battery and signal state fields requiring an accumulator
+# extractor, in the order the fields appear in the [Accumulator] stanza. Each
+# entry is a (sensor, number of channels) tuple, the number of channels is
+# None for single channel sensors.
+_ACCUM_STATE_SENSORS = (('wh40', None), ('wh26', None), ('wh25', None),
+                        ('wh65', None), ('wn32', None), ('wn31', 8),
+                        ('wn34', 8), ('wn35', 8), ('wh41', 4), ('wh45', None),
+                        ('wh51', 16), ('wh54', 4), ('wh55', 4), ('wh57', None),
+                        ('wh68', None), ('ws80', None), ('ws90', None))
+
+
+def _sensor_state_fields(sensors, suffix):
+    """Generate the state field names for a sequence of sensors.
+
+    Field names are of the form sensor_suffix, eg 'wh40_batt', or for
+    multichannel sensors sensor_chN_suffix, eg 'wn31_ch1_batt'.
+    """
+
+    for sensor, channels in sensors:
+        if channels is None:
+            yield f'{sensor}_{suffix}'
+        else:
+            for channel in range(1, channels + 1):
+                yield f'{sensor}_ch{channel}_{suffix}'
+
+
+def _humanlist(items):
+    """Format a sequence of strings as a human readable list.
+
+    Each item is quoted, the last two items are separated by 'or' and any
+    preceding items are comma separated, eg "'a', 'b' or 'c'". An empty
+    sequence results in an empty string.
+    """
+
+    # quote each item
+    quoted = [f"'{item}'" for item in items]
+    # we need at least two items to use 'or'
+    if len(quoted) < 2:
+        return ''.join(quoted)
+    # comma separate all but the last item and 'or' the last item
+    return f"{', '.join(quoted[:-1])} or {quoted[-1]}"
+
+
+def _set_defaults(dst, defaults):
+    """Add default config settings to a config dict.
+
+    Recursively walks the defaults config dict and adds to dst any setting or
+    section that does not already exist in dst. Existing settings in dst are
+    never changed. Sections that exist in both dst and defaults are processed
+    recursively.
+    """
+
+    for key, value in defaults.items():
+        if key not in dst:
+            # dst does not have this key, so add it
+            dst[key] = value
+        elif isinstance(value, dict) and isinstance(dst[key], dict):
+            # the key is a section in both, so process the section
+            _set_defaults(dst[key], value)
+
+
 class EcowittHttpDriverConfEditor(weewx.drivers.AbstractConfEditor):
     """Config editor class for the Ecowitt local HTTP driver."""
 
-    # define our config as a multiline string so we can preserve comments
-    accum_config_str = """
-    [Accumulator]
-        # Start Ecowitt local HTTP API driver extractors
-        [[daymaxwind]]
-            extractor = last
-        [[lightning_distance]]
-            extractor = last
-        [[lightning_strike_count]]
-            extractor = sum
-        [[lightning_last_det_time]]
-            extractor = last
-        [[t_rain]]
-            extractor = sum
-        [[t_rainevent]]
-            extractor = last
-        [[t_rainhour]]
-            extractor = last
-        [[t_stormRain]]
-            extractor = last
-        [[t_rainday]]
-            extractor = last
-        [[t_rainweek]]
-            extractor = last
-        [[t_rainmonth]]
-            extractor = last
-        [[t_rainyear]]
-            extractor = last
-        [[p_rain]]
-            extractor = sum
-        [[p_rainevent]]
-            extractor = last
-        [[p_rainhour]]
-            extractor = last
-        [[p_stormRain]]
-            extractor = last
-        [[p_rainday]]
-            extractor = last
-        [[p_rainweek]]
-            extractor = last
-        [[p_rainmonth]]
-            extractor = last
-        [[p_rainyear]]
-            extractor = last
-        [[is_raining]]
-            extractor = last
-        [[pm2_51_24h_avg]]
-            extractor = last
-        [[pm2_52_24h_avg]]
-            extractor = last
-        [[pm2_53_24h_avg]]
-            extractor = last
-        [[pm2_54_24h_avg]]
-            extractor = last
-        [[pm2_55_24h_avg]]
-            extractor = last
-        [[pm10_24h_avg]]
-            extractor = last
-        [[co2_24h_avg]]
-            extractor = last
-        [[heap_free]]
-            extractor = last
-        [[wh40_batt]]
-            extractor = last
-        [[wh26_batt]]
-            extractor = last
-        [[wh25_batt]]
-            extractor = last
-        [[wh65_batt]]
-            extractor = last
-        [[wn32_batt]]
-            extractor = last
-        [[wn31_ch1_batt]]
-            extractor = last
-        [[wn31_ch2_batt]]
-            extractor = last
-        [[wn31_ch3_batt]]
-            extractor = last
-        [[wn31_ch4_batt]]
-            extractor = last
-        [[wn31_ch5_batt]]
-            extractor = last
-        [[wn31_ch6_batt]]
-            extractor = last
-        [[wn31_ch7_batt]]
-            extractor = last
-        [[wn31_ch8_batt]]
-            extractor = last
-        [[wn34_ch1_batt]]
-            extractor = last
-        [[wn34_ch2_batt]]
-            extractor = last
-        [[wn34_ch3_batt]]
-            extractor = last
-        [[wn34_ch4_batt]]
-            extractor = last
-        [[wn34_ch5_batt]]
-            extractor = last
-        [[wn34_ch6_batt]]
-            extractor = last
-        [[wn34_ch7_batt]]
-            extractor = last
-        [[wn34_ch8_batt]]
-            extractor = last
-        [[wn35_ch1_batt]]
-            extractor = last
-        [[wn35_ch2_batt]]
-            extractor = last
-        [[wn35_ch3_batt]]
-            extractor = last
-        [[wn35_ch4_batt]]
-            extractor = last
-        [[wn35_ch5_batt]]
-            extractor = last
-        [[wn35_ch6_batt]]
-            extractor = last
-        [[wn35_ch7_batt]]
-            extractor = last
-        [[wn35_ch8_batt]]
-            extractor = last
-        [[wh41_ch1_batt]]
-            extractor = last
-        [[wh41_ch2_batt]]
-            extractor = last
-        [[wh41_ch3_batt]]
-            extractor = last
-        [[wh41_ch4_batt]]
-            extractor = last
-        [[wh45_batt]]
-            extractor = last
-        [[wh51_ch1_batt]]
-            extractor = last
-        [[wh51_ch2_batt]]
-            extractor = last
-        [[wh51_ch3_batt]]
-            extractor = last
-        [[wh51_ch4_batt]]
-            extractor = last
-        [[wh51_ch5_batt]]
-            extractor = last
-        [[wh51_ch6_batt]]
-            extractor = last
-        [[wh51_ch7_batt]]
-            extractor = last
-        [[wh51_ch8_batt]]
-            extractor = last
-        [[wh51_ch9_batt]]
-            extractor = last
-        [[wh51_ch10_batt]]
-            extractor = last
-        [[wh51_ch11_batt]]
-            extractor = last
-        [[wh51_ch12_batt]]
-            extractor = last
-        [[wh51_ch13_batt]]
-            extractor = last
-        [[wh51_ch14_batt]]
-            extractor = last
-        [[wh51_ch15_batt]]
-            extractor = last
-        [[wh51_ch16_batt]]
-            extractor = last
-        [[wh54_ch1_batt]]
-            extractor = last
-        [[wh54_ch2_batt]]
-            extractor = last
-        [[wh54_ch3_batt]]
-            extractor = last
-        [[wh54_ch4_batt]]
-            extractor = last
-        [[wh55_ch1_batt]]
-            extractor = last
-        [[wh55_ch2_batt]]
-            extractor = last
-        [[wh55_ch3_batt]]
-            extractor = last
-        [[wh55_ch4_batt]]
-            extractor = last
-        [[wh57_batt]]
-            extractor = last
-        [[wh68_batt]]
-            extractor = last
-        [[ws80_batt]]
-            extractor = last
-        [[ws90_batt]]
-            extractor = last
-        [[wh40_sig]]
-            extractor = last
-        [[wh26_sig]]
-            extractor = last
-        [[wh25_sig]]
-            extractor = last
-        [[wh65_sig]]
-            extractor = last
-        [[wn32_sig]]
-            extractor = last
-        [[wn31_ch1_sig]]
-            extractor = last
-        [[wn31_ch2_sig]]
-            extractor = last
-        [[wn31_ch3_sig]]
-            extractor = last
-        [[wn31_ch4_sig]]
-            extractor = last
-        [[wn31_ch5_sig]]
-            extractor = last
-        [[wn31_ch6_sig]]
-            extractor = last
-        [[wn31_ch7_sig]]
-            extractor = last
-        [[wn31_ch8_sig]]
-            extractor = last
-        [[wn34_ch1_sig]]
-            extractor = last
-        [[wn34_ch2_sig]]
-            extractor = last
-        [[wn34_ch3_sig]]
-            extractor = last
-        [[wn34_ch4_sig]]
-            extractor = last
-        [[wn34_ch5_sig]]
-            extractor = last
-        [[wn34_ch6_sig]]
-            extractor = last
-        [[wn34_ch7_sig]]
-            extractor = last
-        [[wn34_ch8_sig]]
-            extractor = last
-        [[wn35_ch1_sig]]
-            extractor = last
-        [[wn35_ch2_sig]]
-            extractor = last
-        [[wn35_ch3_sig]]
-            extractor = last
-        [[wn35_ch4_sig]]
-            extractor = last
-        [[wn35_ch5_sig]]
-            extractor = last
-        [[wn35_ch6_sig]]
-            extractor = last
-        [[wn35_ch7_sig]]
-            extractor = last
-        [[wn35_ch8_sig]]
-            extractor = last
-        [[wh41_ch1_sig]]
-            extractor = last
-        [[wh41_ch2_sig]]
-            extractor = last
-        [[wh41_ch3_sig]]
-            extractor = last
-        [[wh41_ch4_sig]]
-            extractor = last
-        [[wh45_sig]]
-            extractor = last
-        [[wh51_ch1_sig]]
-            extractor = last
-        [[wh51_ch2_sig]]
-            extractor = last
-        [[wh51_ch3_sig]]
-            extractor = last
-        [[wh51_ch4_sig]]
-            extractor = last
-        [[wh51_ch5_sig]]
-            extractor = last
-        [[wh51_ch6_sig]]
-            extractor = last
-        [[wh51_ch7_sig]]
-            extractor = last
-        [[wh51_ch8_sig]]
-            extractor = last
-        [[wh51_ch9_sig]]
-            extractor = last
-        [[wh51_ch10_sig]]
-            extractor = last
-        [[wh51_ch11_sig]]
-            extractor = last
-        [[wh51_ch12_sig]]
-            extractor = last
-        [[wh51_ch13_sig]]
-            extractor = last
-        [[wh51_ch14_sig]]
-            extractor = last
-        [[wh51_ch15_sig]]
-            extractor = last
-        [[wh51_ch16_sig]]
-            extractor = last
-        [[wh54_ch1_sig]]
-            extractor = last
-        [[wh54_ch2_sig]]
-            extractor = last
-        [[wh54_ch3_sig]]
-            extractor = last
-        [[wh54_ch4_sig]]
-            extractor = last
-        [[wh55_ch1_sig]]
-            extractor = last
-        [[wh55_ch2_sig]]
-            extractor = last
-        [[wh55_ch3_sig]]
-            extractor = last
-        [[wh55_ch4_sig]]
-            extractor = last
-        [[wh57_sig]]
-            extractor = last
-        [[wh68_sig]]
-            extractor = last
-        [[ws80_sig]]
-            extractor = last
-        # End Ecowitt local HTTP API driver extractors
-    """
+    # comment placed before the driver extractors in a new [Accumulator]
+    # stanza
+    accum_comment = '# Start Ecowitt local HTTP API driver extractors'
     # Ecowitt cumulative rain fields, in order of preference, used to calculate
     # a WeeWX 'rain' field for a traditional type rainfall gauge
     t_src_fields = ('rain.0x13.val', 'rain.0x12.val', 'rain.0x11.val', 'rain.0x10.val')
     # Ecowitt cumulative rain fields, in order of preference, used to calculate
     # a WeeWX 'rain' field for a piezo type rainfall gauge
     p_src_fields = ('piezoRain.0x13.val', 'piezoRain.0x12.val', 'piezoRain.0x11.val', 'piezoRain.0x10.val')
+    # Rain config parameters for each gauge type. Each entry is a tuple of the
+    # Ecowitt cumulative rain source fields in order of preference, the WeeWX
+    # field that will be replaced by 'rain', the WeeWX field to be added back
+    # to StdWXCalculate when changing from the other gauge type and the
+    # Ecowitt field to be mapped to WeeWX field rainRate.
+    gauge_specs = {'tipping': (t_src_fields, 't_rain', 'p_rain', 'rain.0x0E.val'),
+                   'piezo': (p_src_fields, 'p_rain', 't_rain', 'piezoRain.0x0E.val')}
+    # The lightning strike count config. The config is invariant so define it
+    # once as a dict rather than parsing a config string each time it is used.
+    lightning_config = {
+        'StdWXCalculate': {
+            'Calculations': {'lightning_strike_count': 'prefer_hardware'},
+            'Delta': {'lightning_strike_count': {'input': 'lightningcount'}}
+        }
+    }
+    # frozenset companions of t_src_fields and p_src_fields for membership
+    # tests, the tuples are retained for their order of preference
+    _t_src_set = frozenset(t_src_fields)
+    _p_src_set = frozenset(p_src_fields)
+    # timeout in seconds used when querying the device for paired rain gauges,
+    # the result is only used as a prompt default so we do not wait long
+    paired_query_timeout = 1
+    # prompt used to obtain the rain gauge type(s) paired with the device,
+    # formatted as an 80 character wide multiline string
+    paired_prompt = textwrap.fill("""Ecowitt gateways/consoles can simultaneously support both tipping and 
+piezoelectric (piezo) rain gauges. Select the gauge type(s) paired with this device. Set
+to 'none' if no gauges are paired, 'tipping' if only a tipping gauge is paired, 
+'piezo' if only a piezo gauge is paired or 'both' if both a tipping gauge and a 
+piezo gauge are paired.""", 80, break_long_words=False)
+    # text of the prompt used to select the gauge type used to populate the
+    # WeeWX rain fields, the selection string varies with the paired gauges
+    _rain_gauge_prompt_text = """By default, per-period rainfall values and rain rates will appear in
+fields 't_rain'/'t_rainrate' and 'p_rain'/'p_rainrate for paired tipping and 
+piezo rain gauges respectively. WeeWX can populate the default WeeWX rain observations 
+('rain' and 'rainRate') from either a paired tipping or piezo rain gauge. {selection}"""
+    # Formatted prompt and possible responses used to select the gauge type
+    # used to populate the WeeWX rain fields keyed by the paired gauge(s). The
+    # prompts are invariant so construct them once only.
+    rain_gauge_prompts = {
+        'both': (textwrap.fill(_rain_gauge_prompt_text.format(
+            selection="Set to 'tipping' to populate the WeeWX rain fields from a paired tipping gauge, "
+                      "'piezo' to populate the WeeWX rain fields from a paired piezo gauge or "
+                      "'none' to not populate the WeeWX rain fields."), 80, break_long_words=False),
+                 ('tipping', 'piezo', 'none')),
+        'tipping': (textwrap.fill(_rain_gauge_prompt_text.format(
+            selection="Set to 'tipping' to populate the WeeWX rain fields from a paired tipping gauge or "
+                      "'none' to not populate the WeeWX rain fields."), 80, break_long_words=False),
+                    ('tipping', 'none')),
+        'piezo': (textwrap.fill(_rain_gauge_prompt_text.format(
+            selection="Set to 'piezo' to populate the WeeWX rain fields from a paired piezo gauge or "
+                      "'none' to not populate the WeeWX rain fields."), 80, break_long_words=False),
+                  ('piezo', 'none'))
+    }
 
-    @property
-    def default_stanza(self):
-        return f"""
+    # The default driver config stanza. The stanza content is invariant so
+    # construct it once only when the class is created.
+    default_stanza = f"""
     [EcowittHttp]
         # This section is for the Ecowitt local HTTP API driver.
 
@@ -2492,8 +2309,6 @@ class EcowittHttpDriverConfEditor(weewx.drivers.AbstractConfEditor):
     def modify_config(self, config_dict):
         """Make Ecowitt local HTTP API driver specific changes to WeeWX config."""
 
-        import weecfg
-
         # set loop_on_init
         self.do_loop_on_init(config_dict)
         # configure rain calculations
@@ -2504,8 +2319,6 @@ class EcowittHttpDriverConfEditor(weewx.drivers.AbstractConfEditor):
         self.do_archive_record_generation(config_dict)
         # configure extractors
         self.do_extractors(config_dict)
-        # we don't need weecfg anymore so remove it from memory
-        del weecfg
 
     @staticmethod
     def do_loop_on_init(config_dict):
@@ -2521,14 +2334,12 @@ Consequently, the absence of a network connection when WeeWX starts will cause
 WeeWX to exit. The WeeWX 'loop_on_init' setting can be used to mitigate such
 problems by having WeeWX retry startup indefinitely. Set to '0' to attempt
 startup once only or '1' to attempt startup indefinitely."""
-        # obtain the user loop_on_init setting, coerce to an integer
-        loop_on_init = int(weecfg.prompt_with_options(prompt, default, ['0', '1']))
-        # define the loop_on_init template string
-        loop_on_init_config_str = f'loop_on_init = {loop_on_init:d}'
-        # convert the loop_on_init config to a ConfigObj
-        loop_on_init_dict = configobj.ConfigObj(io.StringIO(loop_on_init_config_str))
-        # merge the loop_on_init config into our overall config
-        config_dict.merge(loop_on_init_dict)
+        # obtain the user loop_on_init setting, the response can only be '0' or
+        # '1' so there is no need to parse it as an integer
+        loop_on_init = 1 if weecfg.prompt_with_options(prompt, default, ['0', '1']) == '1' else 0
+        # merge the loop_on_init config into our overall config, there is no
+        # need to parse a config string, merge accepts a dict
+        config_dict.merge({'loop_on_init': f'{loop_on_init:d}'})
         # if we don't have any loop_on_init comments add a brief explanatory
         # comment
         if len(config_dict.comments['loop_on_init']) == 0:
@@ -2558,33 +2369,44 @@ startup once only or '1' to attempt startup indefinitely."""
         # user - the user does not necessarily know the 'dotted' Ecowitt field
         # names.
         mapper = HttpMapper(driver_config_dict)
+        # we refer to the field map several times so obtain a local reference
+        fm = mapper.field_map
+        # obtain the set of Ecowitt fields used in the field map, we test for
+        # membership of this set several times so construct it once only
+        fm_values = frozenset(fm.values())
+        # construct a small inverse map of Ecowitt field to WeeWX field for
+        # the Ecowitt cumulative rain source fields that appear in the field
+        # map, we only ever need to do an inverse lookup of these fields
+        rain_src_fields = EcowittHttpDriverConfEditor._t_src_set | EcowittHttpDriverConfEditor._p_src_set
+        rain_inv = {e_field: w_field for w_field, e_field in fm.items() if e_field in rain_src_fields}
         # Determine the rain gauge type(s) paired with the device. To do this
         # we obtain an EcowittDevice and inspect the paired_rain_gauges
-        # property.
+        # property. The result is only used as the default response to a
+        # prompt so make one short attempt only, if we have no IP address or
+        # the device cannot be contacted we use None.
         # first get the device IP address
         ip_address = driver_config_dict.get('ip_address')
-        # now get an EcowittDevice object
-        try:
-            device = EcowittDevice(ip_address=ip_address)
-        except weewx.ViolatedPrecondition:
-            raise
-        else:
-            # and finally get the paired_rain_gauges property
-            paired = device.paired_rain_gauges
-            paired_str = 'none'
-            if paired is not None:
-                paired_str = 'both' if len(paired) == 2 else paired[0]
-        # construct the prompt text
-        _prompt = """Ecowitt gateways/consoles can simultaneously support both tipping and 
-piezoelectric (piezo) rain gauges. Select the gauge type(s) paired with this device. Set
-to 'none' if no gauges are paired, 'tipping' if only a tipping gauge is paired, 
-'piezo' if only a piezo gauge is paired or 'both' if both a tipping gauge and a 
-piezo gauge are paired."""
-        # format the prompt string to a 80 character wide multiline string
-        prompt = '\n'.join([i for i in textwrap.wrap(_prompt, 80, break_long_words=False)])
+        # initialise the paired rain gauges
+        paired = None
+        # we can only query the device if we have an IP address
+        if ip_address is not None:
+            # get an EcowittDevice object and obtain the paired_rain_gauges
+            # property
+            try:
+                device = EcowittDevice(ip_address=ip_address,
+                                       max_tries=1,
+                                       url_timeout=EcowittHttpDriverConfEditor.paired_query_timeout)
+                paired = device.paired_rain_gauges
+            except (DeviceIOError, ParseError):
+                # we could not contact the device or could not parse the
+                # response, we will have to do without
+                pass
+        # obtain the default paired gauge(s) response, paired may be None or
+        # an empty tuple if there are no paired gauges
+        paired_str = 'none' if not paired else ('both' if len(paired) > 1 else paired[0])
         print()
         # obtain the user rain gauge type(s) paired with the device
-        paired_gauges = weecfg.prompt_with_options(prompt,
+        paired_gauges = weecfg.prompt_with_options(EcowittHttpDriverConfEditor.paired_prompt,
                                                    paired_str,
                                                    ['none', 'tipping', 'piezo', 'both']).lower()
 #        if len(paired) > 0:
@@ -2598,177 +2420,46 @@ piezo gauge are paired."""
             curr_rain_w_src = _deltas_config_dict['rain'].get('input') if 'rain' in _deltas_config_dict else None
             # get the Ecowitt field used to derive the 'cumulative' key used to
             # calculate 'rain', if there isn't such a WeeWX field then use None
-            curr_rain_e_src = mapper.field_map.get(curr_rain_w_src) if curr_rain_w_src is not None else None
+            curr_rain_e_src = fm.get(curr_rain_w_src) if curr_rain_w_src is not None else None
             # Determine the rain gauge type used to calculate 'rain', it will
             # be either 'tipping' or 'piezo'. If we can't determine the type
             # then use the string 'none'.
             curr_gauge_type = 'none'
             if curr_rain_w_src is not None:
-                if curr_rain_e_src in EcowittHttpDriverConfEditor.t_src_fields:
+                if curr_rain_e_src in EcowittHttpDriverConfEditor._t_src_set:
                     curr_gauge_type = 'tipping'
-                elif curr_rain_e_src in EcowittHttpDriverConfEditor.p_src_fields:
+                elif curr_rain_e_src in EcowittHttpDriverConfEditor._p_src_set:
                     curr_gauge_type = 'piezo'
-            # Now determine the preferred WeeWX field name for tipping and
-            # piezo gauges. The preferred field is the available cumulative
-            # rain field with the longest reset interval. If no field is
-            # available (unlikely) then use None.
-            # tipping, set our preferred tipping field name to None until we
-            # find a field
-            pref_t_field = None
-            # iterate over the possible Ecowitt tipping source fields
-            for _field in EcowittHttpDriverConfEditor.t_src_fields:
-                # does that field appear in the field map, it is of no use if it
-                # does not
-                if _field in mapper.field_map.values():
-                    # we have a field we can use, now do an inverse lookup to find
-                    # the WeeWX field it is mapped to
-                    pref_t_field = mapper.field_map.inverse[_field]
-                    # no need to search further, break out of the loop
-                    break
-            # piezo, set our preferred tipping field name to None until we find
-            # a field
-            pref_p_field = None
-            # iterate over the possible Ecowitt piezo source fields
-            for _field in EcowittHttpDriverConfEditor.p_src_fields:
-                # does that field appear in the field map, it is of no use if it
-                # does not
-                if _field in mapper.field_map.values():
-                    # we have a field we can use, now do an inverse lookup to find
-                    # the WeeWX field it is mapped to
-                    pref_p_field = mapper.field_map.inverse[_field]
-                    # no need to search further, break out of the loop
-                    break
-            # initialise a variable to hold the Ecowitt field being used to
-            # populate the WeeWX rainRate field
-            rate_field = None
-            # initialise a variable to hold the WeeWX field name (t_rain or p_rain)
-            # to be added back to StdWXCalculate if the user changes from 'tipping'
-            # to 'none' or 'piezo' to 'none'
-            add_back = None
-            # construct the prompt text, the prompt text will vary depending on
-            # what gauges are paired
-            if paired_gauges == 'both':
-                # both tipping and piezo are paired
-                select_1 = "'tipping' to populate the WeeWX rain fields from a paired tipping gauge"
-                select_2 = "'piezo' to populate the WeeWX rain fields from a paired piezo gauge"
-                select_3 = "'none' to not populate the WeeWX rain fields"
-                punc = ", "
-                conj = " or "
-                possible = ['tipping', 'piezo', 'none']
-            elif paired_gauges == 'tipping':
-                # we have a paired tipping gauge
-                select_1 = "'tipping' to populate the WeeWX rain fields from a paired tipping gauge"
-                select_2 = ""
-                select_3 = "'none' to not populate the WeeWX rain fields"
-                punc = ""
-                conj = " or "
-                possible = ['tipping', 'none']
-            else:
-                # there must be a paired piezo gauge
-                select_1 = ""
-                select_2 = "'piezo' to populate the WeeWX rain fields from a paired piezo gauge"
-                select_3 = "'none' to not populate the WeeWX rain fields"
-                punc = ""
-                conj = " or "
-                possible = ['piezo', 'none']
-            selection_str = f"Set to {select_1}{punc}{select_2}{conj}{select_3}."
-            # now construct the overall prompt string
-            _prompt = f"""By default, per-period rainfall values and rain rates will appear in
-fields 't_rain'/'t_rainrate' and 'p_rain'/'p_rainrate for paired tipping and 
-piezo rain gauges respectively. WeeWX can populate the default WeeWX rain observations 
-('rain' and 'rainRate') from either a paired tipping or piezo rain gauge. {selection_str}"""
-            # format the prompt string to a 80 character wide multiline string
-            prompt = '\n'.join([i for i in textwrap.wrap(_prompt, 80, break_long_words=False)])
+            # obtain the prompt text and possible responses, the prompt text
+            # will vary depending on what gauges are paired
+            prompt, possible = EcowittHttpDriverConfEditor.rain_gauge_prompts[paired_gauges]
             print()
             # obtain the user rain gauge type being used
             user_gauge_type = weecfg.prompt_with_options(prompt,
                                                          curr_gauge_type,
-                                                         possible).lower()
+                                                         list(possible)).lower()
             # given the rain gauge type selected, obtain the source field to be
             # used to calculate WeeWX field 'rain'
             if user_gauge_type in ('tipping', 'piezo'):
-                if user_gauge_type == 'tipping':
-                    # a tipping rainfall gauge was chosen
-
-                    # Get the default WeeWX source field, it is the WeeWX field
-                    # currently used to derive the WeeWX 'rain' field if we are
-                    # currently using a tipping gauge. If the WeeWX field does
-                    # not exist or we are currently using a piezo gauge use the
-                    # preferred tipping field from earlier.
-                    if curr_gauge_type == 'tipping':
-                        # the default WeeWX source field is the field we are
-                        # currently using or if that does not exist the preferred
-                        # tipping source field
-                        default_source = curr_rain_w_src if curr_rain_w_src is not None else pref_t_field
-                    else:
-                        # 'piezo' had been previously selected so choose the
-                        # preferred tipping source field from earlier
-                        default_source = pref_t_field
-                        # the user has chosen 'tipping' and the current gauge type
-                        # is 'piezo' so we will need to add 'p_rain' back to
-                        # StdWXCalculate
-                        add_back = 'p_rain'
-                    # construct a string listing the available WeeWX tipping
-                    # cumulative rain fields, the available fields consist of those
-                    # fields in our tipping source field list that exist in the
-                    # field map
-                    _fields = [mapper.field_map.inverse[f] for f in EcowittHttpDriverConfEditor.t_src_fields
-                               if f in mapper.field_map.values()]
-                    # set the WeeWX field that will be replaced by 'rain', we will
-                    # need to remove this field from StdWXCalculate before we are
-                    # done
-                    rain_field = 't_rain'
-                    # set the Ecowitt field to be used to map to WeeWX field
-                    # rainRate
-                    rate_field = 'rain.0x0E.val'
-                else:
-                    # a piezo rainfall gauge was chosen
-
-                    # Get the default WeeWX source field, it is the WeeWX field
-                    # currently used to derive the WeeWX 'rain' field if we are
-                    # currently using a piezo gauge. If one does not exist or we are
-                    # currently using a tipping gauge use the preferred piezo field
-                    # from earlier.
-                    if curr_gauge_type == 'piezo':
-                        default_source = curr_rain_w_src if curr_rain_w_src is not None else pref_p_field
-                    else:
-                        default_source = pref_p_field
-                        add_back = 't_rain'
-                    # construct a string listing the available WeeWX piezo cumulative
-                    # rain fields
-                    _fields = [mapper.field_map.inverse[f] for f in EcowittHttpDriverConfEditor.p_src_fields
-                               if f in mapper.field_map.values()]
-                    # set the WeeWX field that will be replaced by 'rain', we will
-                    # need to remove this field from StdWXCalculate before we are
-                    # done
-                    rain_field = 'p_rain'
-                    # set the Ecowitt field to be used to map to WeeWX field
-                    # rainRate
-                    rate_field = 'piezoRain.0x0E.val'
-                # Construct a string consisting of a comma separated list of
-                # available cumulative WeeWX fields. This needs a bit of
-                # finessing to get the grammar correct.
-                if len(_fields) == 1:
-                    # we have just one field so this is simple
-                    options = f" Possible observations are '{_fields[0]}'"
-                elif len(_fields) == 2:
-                    # we have two fields so separate them with 'or'
-                    _options = ' or '.join(_fields)
-                    options = f" Possible observations are '{_options}'"
-                elif len(_fields) > 2:
-                    # we have more than two fields so comma separate the first
-                    # n-1 and 'or' the last one
-                    _first = ', '.join(_fields[:-1])
-                    options = f" Possible observations are {' or '.join([_first, _fields[-1]])}"
-                else:
-                    # this should not happen, but set options just in case
-                    options = ''
+                # Obtain the default WeeWX source field, the available WeeWX
+                # cumulative rain fields, the WeeWX field that will be replaced
+                # by 'rain', the Ecowitt field to be mapped to WeeWX field
+                # rainRate and the WeeWX field name (t_rain or p_rain), if any,
+                # to be added back to StdWXCalculate.
+                _params = EcowittHttpDriverConfEditor.gauge_config(user_gauge_type,
+                                                                   curr_gauge_type,
+                                                                   curr_rain_w_src,
+                                                                   rain_inv)
+                default_source, _fields, rain_field, rate_field, add_back = _params
+                # construct a string consisting of a comma separated list of
+                # available cumulative WeeWX fields
+                options = f" Possible observations are {_humanlist(_fields)}"
                 # construct the prompt text to use, it includes a list of the
                 # available possible fields
                 _prompt = f"""Select the WeeWX observation to be used to derive 
 WeeWX observation 'rain'. Possible observations are {options}."""
                 # format the prompt string to a 80 character wide multiline string
-                prompt = '\n'.join([i for i in textwrap.wrap(_prompt, 80, break_long_words=False)])
+                prompt = textwrap.fill(_prompt, 80, break_long_words=False)
                 print()
                 # obtain the user rain source field selection
                 rain_source_field = weecfg.prompt_with_options(prompt,
@@ -2778,43 +2469,33 @@ WeeWX observation 'rain'. Possible observations are {options}."""
                 # selections, the rain rate field map extension and any default
                 # rain fields that may need to be added back to StdWXCalculate.
                 # Once we have everything we can do one merge to the config dict.
-                # first construct a config string that reflect the user selected
-                # rain calculations
-                _rain_config_str = f"""
-                    [StdWXCalculate]
-                        [[Calculations]]
-                            rain = prefer_hardware
-                        [[Delta]]
-                            [[[rain]]]
-                                input = {rain_source_field}"""
-                # convert the rain config string to a ConfigObj
-                _rain_config_dict = configobj.ConfigObj(io.StringIO(_rain_config_str))
+                # first construct a ConfigObj that reflects the user selected
+                # rain calculations, construct it directly from a dict rather
+                # than parsing a config string
+                _rain_config_dict = configobj.ConfigObj({
+                    'StdWXCalculate': {
+                        'Calculations': {'rain': 'prefer_hardware'},
+                        'Delta': {'rain': {'input': rain_source_field}}
+                    }
+                })
                 # now add any rain rate field map extension changes
                 # mapping
                 if rate_field is not None:
-                    # we have a rain rate field, construct an appropriate config
-                    # string
-                    _rate_config_str = f"""
-                        [EcowittHttp]
-                            [[field_map_extensions]]
-                                rainRate = {rate_field}"""
-                    # merge the rain rate config into our rain config
-                    _rain_config_dict.merge(configobj.ConfigObj(io.StringIO(_rate_config_str)))
+                    # we have a rain rate field, merge an appropriate config
+                    # dict into our rain config
+                    _rain_config_dict.merge({'EcowittHttp': {'field_map_extensions': {'rainRate': rate_field}}})
                 # if we have had a change from 'tipping' to 'piezo' or vice-versa
                 # we need to add back the old 't_rain' or 'p_rain' calculation,
                 # but only if we have 'both' gauges
                 if add_back is not None and paired_gauges == 'both':
-                    # we have had a change of source, construct a suitable config
-                    # string
-                    _change_config_str = f"""
-                        [StdWXCalculate]
-                            [[Calculations]]
-                                {add_back} = prefer_hardware
-                            [[Delta]]
-                                [[[{add_back}]]]
-                                    input = {add_back}year"""
-                    # merge the 'add back' config into our rain config
-                    _rain_config_dict.merge(configobj.ConfigObj(io.StringIO(_change_config_str)))
+                    # we have had a change of source, merge a suitable 'add back'
+                    # config dict into our rain config
+                    _rain_config_dict.merge({
+                        'StdWXCalculate': {
+                            'Calculations': {add_back: 'prefer_hardware'},
+                            'Delta': {add_back: {'input': f'{add_back}year'}}
+                        }
+                    })
                 # We now have the complete rain config so merge into our overall
                 # config dict
                 config_dict.merge(_rain_config_dict)
@@ -2836,7 +2517,7 @@ WeeWX observation 'rain'. Possible observations are {options}."""
 
                 # do we have a [[Delta]] [[[rain]]], if so remove it
                 if 'rain' in config_dict['StdWXCalculate'].get('Delta', {}) and \
-                        config_dict['StdWXCalculate']['Delta']['rain'] in mapper.field_map.values():
+                        config_dict['StdWXCalculate']['Delta']['rain'].get('input') in fm_values:
                     # we have a [[[rain]]] stanza, we can safely delete it
                     _ = config_dict['StdWXCalculate']['Delta'].pop('rain')
 #                # do we have a [[Calculation]] 'rain' entry, if so remove it
@@ -2847,16 +2528,14 @@ WeeWX observation 'rain'. Possible observations are {options}."""
                 # default WeeWX per-period rain and rain rate fields
                 if curr_gauge_type in ('tipping', 'piezo'):
                     # we went from a gauge to no gauge, construct a suitable config
-                    # string to restore the default WeeWX per-period rain field
-                    _rain_config_str = f"""
-                        [StdWXCalculate]
-                            [[Calculations]]
-                                {curr_gauge_type[0]}_rain = prefer_hardware
-                            [[Delta]]
-                                [[[{curr_gauge_type[0]}_rain]]]
-                                    input = {curr_gauge_type[0]}_rainyear"""
-                    # convert the rain config string to a ConfigObj
-                    _rain_config_dict = configobj.ConfigObj(io.StringIO(_rain_config_str))
+                    # dict to restore the default WeeWX per-period rain field
+                    _rain_field = f'{curr_gauge_type[0]}_rain'
+                    _rain_config_dict = {
+                        'StdWXCalculate': {
+                            'Calculations': {_rain_field: 'prefer_hardware'},
+                            'Delta': {_rain_field: {'input': f'{_rain_field}year'}}
+                        }
+                    }
                     # merge the rain config into our overall config
                     config_dict.merge(_rain_config_dict)
                 # remove any rainRate field map extensions, this will restore the
@@ -2890,7 +2569,7 @@ WeeWX observation 'rain'. Possible observations are {options}."""
                 # do we have a 'rain' delta and if so is it sourced from an
                 # Ecowitt HTTP driver field
                 if 'rain' in config_dict['StdWXCalculate']['Delta'] and \
-                        config_dict['StdWXCalculate']['Delta']['rain'].get('input') in mapper.field_map.values():
+                        config_dict['StdWXCalculate']['Delta']['rain'].get('input') in fm_values:
                     # we an Ecowitt HTTP driver rain delta, remove it
                     _ = config_dict['StdWXCalculate']['Delta'].pop('rain', None)
                 # remove any other Ecowitt sourced deltas
@@ -2901,6 +2580,54 @@ WeeWX observation 'rain'. Possible observations are {options}."""
                 if len(config_dict['StdWXCalculate']['Delta']) == 0:
                     _ = config_dict['StdWXCalculate'].pop('Delta')
 
+    @staticmethod
+    def gauge_config(user_gauge_type, curr_gauge_type, curr_rain_w_src, rain_inv):
+        """Obtain the rain config parameters for a selected rain gauge type.
+
+        The rain config parameters for tipping and piezo gauges differ only in
+        the fields used, so the parameters are obtained from the gauge_specs
+        table.
+
+        user_gauge_type: the rain gauge type selected by the user, 'tipping'
+                         or 'piezo'
+        curr_gauge_type: the rain gauge type currently used to derive WeeWX
+                         field 'rain', 'tipping', 'piezo' or 'none'
+        curr_rain_w_src: the WeeWX field currently used to derive WeeWX field
+                         'rain', may be None
+        rain_inv:        dict keyed by Ecowitt cumulative rain source field
+                         containing the WeeWX field mapped to the Ecowitt field
+
+        Returns a tuple consisting of the default WeeWX source field, a list
+        of the available WeeWX cumulative rain fields in order of preference,
+        the WeeWX field that will be replaced by 'rain', the Ecowitt field to
+        be mapped to WeeWX field rainRate and the WeeWX field to be added back
+        to StdWXCalculate (None if no field need be added back).
+        """
+
+        # obtain the parameters for the selected gauge type
+        src_fields, rain_field, other_rain_field, rate_field = EcowittHttpDriverConfEditor.gauge_specs[user_gauge_type]
+        # obtain a list of the available WeeWX cumulative rain fields, the
+        # available fields consist of those fields in our source field list
+        # that exist in the field map
+        _fields = [rain_inv[f] for f in src_fields if f in rain_inv]
+        # The preferred field is the available cumulative rain field with the
+        # longest reset interval. If no field is available (unlikely) then use
+        # None.
+        pref_field = _fields[0] if _fields else None
+        # Get the default WeeWX source field, it is the WeeWX field currently
+        # used to derive the WeeWX 'rain' field if we are currently using this
+        # gauge type. If the WeeWX field does not exist or we are currently
+        # using another gauge type use the preferred field.
+        if curr_gauge_type == user_gauge_type:
+            default_source = curr_rain_w_src if curr_rain_w_src is not None else pref_field
+            add_back = None
+        else:
+            default_source = pref_field
+            # the gauge type has changed so we will need to add the other
+            # gauge type rain field back to StdWXCalculate
+            add_back = other_rain_field
+        return default_source, _fields, rain_field, rate_field, add_back
+
     @staticmethod
     def do_lightning(config_dict):
         """Configure lightning calculations.
@@ -2913,18 +2640,9 @@ WeeWX observation 'rain'. Possible observations are {options}."""
         # there is no user input for this, but inform the user what we are
         # doing
         print("""Setting lightning_strike_count calculation.""")
-        # define the lightning strike count config string
-        lightning_config_str = """
-        [StdWXCalculate]
-            [[Calculations]]
-                lightning_strike_count = prefer_hardware
-            [[Delta]]
-                [[[lightning_strike_count]]]
-                    input = lightningcount"""
-        # convert the lightning strike count config string to a ConfigObj
-        lightning_config_dict = configobj.ConfigObj(io.StringIO(lightning_config_str))
-        # merge the lightning strike count config into our overall config
-        config_dict.merge(lightning_config_dict)
+        # merge the lightning strike count config into our overall config,
+        # merge copies the config so the class attribute is not modified
+        config_dict.merge(EcowittHttpDriverConfEditor.lightning_config)
 
     @staticmethod
     def do_archive_record_generation(config_dict):
@@ -2940,6 +2658,78 @@ WeeWX observation 'rain'. Possible observations are {options}."""
         # update the record_generation setting directly
         config_dict['StdArchive']['record_generation'] = 'software'
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def accum_extractors():
+        """Obtain the accumulator extractor functions.
+
+        Returns a read only mapping of the accumulator extractor functions for
+        driver unique WeeWX fields requiring non-default (average) extractors,
+        in the order the fields are to appear in the [Accumulator] stanza.
+
+        The extractor functions are only required when the config editor is
+        used, so the mapping is constructed on first use and then cached
+        rather than being constructed whenever the driver is imported.
+        """
+
+        return types.MappingProxyType({
+            'daymaxwind': 'last',
+            'lightning_distance': 'last',
+            'lightning_strike_count': 'sum',
+            'lightning_last_det_time': 'last',
+            't_rain': 'sum',
+            't_rainevent': 'last',
+            't_rainhour': 'last',
+            't_stormRain': 'last',
+            't_rainday': 'last',
+            't_rainweek': 'last',
+            't_rainmonth': 'last',
+            't_rainyear': 'last',
+            'p_rain': 'sum',
+            'p_rainevent': 'last',
+            'p_rainhour': 'last',
+            'p_stormRain': 'last',
+            'p_rainday': 'last',
+            'p_rainweek': 'last',
+            'p_rainmonth': 'last',
+            'p_rainyear': 'last',
+            'is_raining': 'last',
+            'pm2_51_24h_avg': 'last',
+            'pm2_52_24h_avg': 'last',
+            'pm2_53_24h_avg': 'last',
+            'pm2_54_24h_avg': 'last',
+            'pm2_55_24h_avg': 'last',
+            'pm10_24h_avg': 'last',
+            'co2_24h_avg': 'last',
+            'heap_free': 'last',
+            # battery and signal state fields
+            **dict.fromkeys(_sensor_state_fields(_ACCUM_STATE_SENSORS, 'batt'), 'last'),
+            # there is no WS90 signal state field
+            **dict.fromkeys(_sensor_state_fields(_ACCUM_STATE_SENSORS[:-1], 'sig'), 'last')
+        })
+
+    @staticmethod
+    def accum_config():
+        """Obtain our default accumulator config.
+
+        The default accumulator config is constructed directly from the
+        accum_extractors mapping rather than by parsing a config string.
+
+        Returns a ConfigObj containing an [Accumulator] stanza.
+        """
+
+        # construct the [Accumulator] stanza with a [[field]] sub-stanza
+        # setting the extractor function for each field
+        extractors = EcowittHttpDriverConfEditor.accum_extractors()
+        accum_config_dict = configobj.ConfigObj(
+            {'Accumulator': {field: {'extractor': extractor}
+                             for field, extractor in extractors.items()}}
+        )
+        # add our comment before the first of our fields
+        first_field = next(iter(extractors))
+        accum_config_dict['Accumulator'].comments[first_field] = [EcowittHttpDriverConfEditor.accum_comment]
+        return accum_config_dict
+
     @staticmethod
     def do_extractors(config_dict):
         """Configure extractors.
@@ -2953,14 +2743,11 @@ WeeWX observation 'rain'. Possible observations are {options}."""
         # doing
         print("""Setting accumulator extractor functions.""")
         # construct our default accumulator config dict
-        accum_config_dict = configobj.ConfigObj(io.StringIO(EcowittHttpDriverConfEditor.accum_config_str))
-        # merge the existing config dict into our default accumulator config
-        # dict before merging tje updated accumulator config dict into our
-        # config dict, doing the merge in this manner is wasteful but preserves
-        # any existing accumulator config settings originally in config_dict
-        accum_config_dict.merge(config_dict)
-        # now merge the updated accumulator config into the config dict
-        config_dict.merge(accum_config_dict)
+        accum_config_dict = EcowittHttpDriverConfEditor.accum_config()
+        # add any of our default accumulator config settings that are not
+        # already in the config dict, this preserves any existing accumulator
+        # config settings without having to merge the entire config dict
+        _set_defaults(config_dict, accum_config_dict)
 
 
 # ============================================================================
@@ -3718,7 +3505,7 @@ class EcowittNetCatchup(Catchup):
             # code 0
             try:
                 # attempt to decode the response as JSON
-                json_resp = json.loads(response)
+                json_resp = json_loads(response)
             except json.JSONDecodeError as e:
                 # the response could not be decoded as JSON, raise an
                 # InvalidApiResponseError exception
@@ -4048,8 +3835,11 @@ class EcowittDeviceCatchup:
                 # now try to decode the file contents, if the file cannot be
                 # decoded log it and continue
                 try:
-                    # decode the
-                    lines = [l.decode('utf-8') for l in response.readlines()]
+                    # Read and decode the file contents in one operation
+                    # rather than line by line, then split the decoded text
+                    # into lines. This avoids a per-line decode of what may be
+                    # many thousands of history file lines.
+                    lines = response.read().decode('utf-8').splitlines(keepends=True)
                 except UnicodeDecodeError as e:
                     log.error("Unable to decode file '%s' from %s at %s",
                               file, self.device.model, self.ip_address)
@@ -4095,7 +3885,7 @@ class EcowittDeviceCatchup:
                     d[file_rec['datetime']].update(file_rec)
             # the combined data will likely not be in date-time order, so sort
             # the data by ascending timestamp
-            sorted_recs = sorted(list(d.values()), key=operator.itemgetter('datetime'))
+            sorted_recs = sorted(d.values(), key=itemgetter('datetime'))
             # now we can yield the records for the current year-month
             for rec in sorted_recs:
                 yield rec
@@ -4139,7 +3929,7 @@ class EcowittDeviceCatchup:
             # 'Time' field cannot be parsed ignore the record and continue to
             # the next record
             try:
-                ts = datetime.datetime.strptime(row['Time'], '%Y-%m-%d %H:%M').timestamp()
+                ts = self.parse_time(row['Time'])
             except ValueError:
                 # the 'Time' field could not be parsed, so ignore it and
                 # continue with the next record
@@ -4168,6 +3958,30 @@ class EcowittDeviceCatchup:
         # later once the month records are coalesced
         return result
 
+    @staticmethod
+    def parse_time(time_str):
+        """Convert a history file 'Time' field to an epoch timestamp.
+
+        History file 'Time' fields are local time strings in the format
+        'YYYY-MM-DD HH:MM'. datetime.strptime() is relatively slow and is
+        called for every history file record, so where the string is in the
+        expected fixed width format the date-time components are extracted
+        directly. Anything else is handed to strptime() which will raise a
+        ValueError if the string cannot be parsed.
+        """
+
+        # check for the expected fixed width format
+        if (len(time_str) == 16 and time_str[4] == '-' and time_str[7] == '-'
+                and time_str[10] == ' ' and time_str[13] == ':'):
+            # Extract the date-time components and obtain the timestamp. A
+            # ValueError will be raised if any component is non-numeric or
+            # out of range.
+            return datetime.datetime(int(time_str[0:4]), int(time_str[5:7]),
+                                     int(time_str[8:10]), int(time_str[11:13]),
+                                     int(time_str[14:16])).timestamp()
+        # not the expected format, let strptime() deal with it
+        return datetime.datetime.strptime(time_str, '%Y-%m-%d %H:%M').timestamp()
+
     @staticmethod
     def get_units(keys):
         """Extract the history file units from the history file field names.
@@ -4644,7 +4458,7 @@ class EcowittHttpDriver(weewx.drivers.AbstractDevice, EcowittCommon):
             # empty
             try:
                 # get any data from the collector queue
-                queue_data = self.collector.queue.get(True, 10)
+                queue_data = self.collector.get(10)
             except queue.Empty:
                 # there was nothing in the queue so continue
                 pass
@@ -4987,11 +4801,130 @@ class EcowittHttpDriver(weewx.drivers.AbstractDevice, EcowittCommon):
 # ============================================================================
 
 class Collector:
-    """Base class for a threaded client to pass data to a parent via a queue."""
+    """Base class for a threaded client to pass data to a parent via a queue.
 
-    def __init__(self):
-        # create a Queue object for passing data to a parent process
-        self.queue = queue.Queue()
+    The queue is a bounded deque guarded by a condition variable owned by the
+    Collector. Owning the queue allows items to be queued and removed in bulk
+    under a single lock and allows the latest sensor data to be held apart
+    from any queued control data. Our parent obtains items using get() or
+    drain_queue().
+    """
+
+    def __init__(self, max_queue_size=DEFAULT_MAX_QUEUE_SIZE, latest_data_only=False):
+        # Create a deque for passing data to a parent process. The queue is
+        # bounded so that memory use cannot grow without limit should our
+        # parent stop consuming data.
+        self._queue = collections.deque()
+        self._max_queue_size = max_queue_size
+        # condition variable guarding the queue and the latest data slot, our
+        # parent waits on the condition for something to arrive
+        self._queue_cond = threading.Condition()
+        # whether we have logged that the queue is full, we log once only
+        # each time the queue fills
+        self._queue_full_logged = False
+        # Whether our parent only needs the latest sensor data. If so sensor
+        # data (a dict) is held in a single slot, with newer sensor data
+        # replacing older sensor data, and only control data (eg exceptions)
+        # is queued.
+        self.latest_data_only = latest_data_only
+        self._latest_data = None
+
+    def put_newest(self, item):
+        """Place an item in the queue, discarding the oldest item if full.
+
+        For live data the newest data is the most useful, so if the queue is
+        full discard the oldest queued item to make room for the new item.
+
+        If our parent only needs the latest sensor data, sensor data (a dict)
+        replaces any sensor data held in the latest data slot rather than
+        being queued. Any other item is control data (eg an exception) and is
+        queued, but first any sensor data held in the slot is moved to the
+        queue so that our parent receives items in the order they were
+        produced. As a result control data never displaces sensor data that
+        our parent has not yet received.
+        """
+
+        with self._queue_cond:
+            if self.latest_data_only and type(item) is dict:
+                # we have sensor data, it replaces any held sensor data
+                self._latest_data = item
+            else:
+                # move any held sensor data to the queue ahead of our item
+                if self._latest_data is not None:
+                    self._append_locked(self._latest_data)
+                    self._latest_data = None
+                self._append_locked(item)
+            # let our parent know there is something to collect
+            self._queue_cond.notify()
+
+    def _append_locked(self, item):
+        """Append an item to the queue, discarding the oldest item if full.
+
+        Must be called while holding the queue condition lock.
+        """
+
+        if 0 < self._max_queue_size <= len(self._queue):
+            # the queue is full, log it if we have not already done so
+            if not self._queue_full_logged:
+                log.warning('Collector queue is full, discarding oldest data')
+                self._queue_full_logged = True
+            # discard the oldest item
+            self._queue.popleft()
+        else:
+            # the item will be queued without discarding anything
+            self._queue_full_logged = False
+        self._queue.append(item)
+
+    def get(self, timeout):
+        """Remove and return the oldest item.
+
+        If there is nothing to remove wait up to timeout seconds for something
+        to arrive. Any sensor data held in the latest data slot is always the
+        newest item.
+
+        Raises a queue.Empty exception if nothing arrived within timeout
+        seconds.
+        """
+
+        with self._queue_cond:
+            # if there is nothing to remove wait, but not too long, for
+            # something to arrive
+            if not self._queue_cond.wait_for(lambda: self._queue or self._latest_data is not None,
+                                             timeout):
+                raise queue.Empty
+            # return the oldest queued item if there is one
+            if self._queue:
+                return self._queue.popleft()
+            # otherwise return the held sensor data
+            item, self._latest_data = self._latest_data, None
+            return item
+
+    def drain_queue(self, timeout=0.5):
+        """Remove and return all items currently in the queue.
+
+        Items already in the queue, and any sensor data held in the latest
+        data slot, are removed in one go under a single lock without waiting.
+        If there is nothing to remove wait up to timeout seconds for something
+        to arrive.
+
+        Returns a list of zero or more items, oldest first. Any sensor data
+        held in the latest data slot is always the newest item.
+        """
+
+        with self._queue_cond:
+            # if there is nothing to remove wait, but not too long, for
+            # something to arrive
+            if not self._queue and self._latest_data is None:
+                self._queue_cond.wait(timeout)
+            # remove all items from the queue in one go
+            items = list(self._queue)
+            self._queue.clear()
+            # add any held sensor data, it is newer than any queued item
+            if self._latest_data is not None:
+                items.append(self._latest_data)
+                self._latest_data = None
+        # return the items
+        return items
 
     def startup(self):
         pass
@@ -5029,11 +4962,12 @@ class EcowittHttpCollector(Collector):
                  show_battery=DEFAULT_FILTER_BATTERY,
                  log_unknown_fields=False,
                  fw_update_check_interval=DEFAULT_FW_CHECK_INTERVAL,
+                 latest_data_only=False,
                  debug = DebugOptions()):
         """Initialise a EcowittHttpCollector object."""
 
         # initialize my base class
-        super().__init__()
+        super().__init__(latest_data_only=latest_data_only)
 
         # interval between polls of the API, defaults to DEFAULT_POLL_INTERVAL
         self.poll_interval = poll_interval
@@ -5116,8 +5050,9 @@ class EcowittHttpCollector(Collector):
                     queue_data = e
                 if self.debug.collector:
                     log.info('Collected data: %s', queue_data)
-                # put the queue data in the queue
-                self.queue.put(queue_data)
+                # put the queue data in the queue, discarding the oldest
+                # queued data if the queue is full
+                self.put_newest(queue_data)
                 # debug log when we will next poll the API
                 if weewx.debug or self.debug.collector:
                     log.info('Next update in %d seconds', self.poll_interval)
@@ -5175,9 +5110,11 @@ class EcowittHttpCollector(Collector):
         # appearing twice under two different fields, but later field mapping
         # will take care of this.
         curr_data.update(self.device.get_sensors_data())
-        # log the combined current data but only if debug>=3
-        if weewx.debug >= 3:
-            log.debug('Current data: %s' % curr_data)
+        # log the combined current data but only if debug>=3, the current
+        # data dict is large so only format it if debug level messages will
+        # actually be emitted
+        if weewx.debug >= 3 and log.isEnabledFor(logging.DEBUG):
+            log.debug('Current data: %s', curr_data)
         return curr_data
 
     def startup(self):
@@ -5211,6 +5148,8 @@ class EcowittHttpCollector(Collector):
             else:
                 log.info('EcowittHttpCollector thread has been terminated')
         self.thread = None
+        # close our connection to the device
+        self.device.close()
 
     class CollectorThread(threading.Thread):
         """Class using a thread to collect data via the local HTTP API."""
@@ -5276,8 +5215,15 @@ class EcowittHttpApi:
         self.max_tries = max_tries
         # wait time in seconds between attempt to contact the device
         self.retry_wait = retry_wait
-        # timeout in seconds to be used for urlopen calls
+        # timeout in seconds to be used for HTTP requests
         self.timeout = timeout
+        # Persistent HTTP connection to the device. The connection is kept
+        # alive between requests to avoid a TCP connection setup per API
+        # command. The connection is created on first use.
+        self._connection = None
+        # the connection may be used by more than one thread, so use a lock to
+        # serialise requests
+        self._connection_lock = threading.Lock()
 
     def request(self, command_str, data=None, headers=None):
         """Send a HTTP request to the device and return the response.
@@ -5304,47 +5250,37 @@ class EcowittHttpApi:
         if command_str in EcowittHttpApi.commands:
             # first convert any data to a percent-encoded ASCII text string
             data_enc = urllib.parse.urlencode(data_dict)
-            # construct the scheme and host portions of the URL
-            stem = ''.join(['http://', self.ip_address])
-            # now add the 'path'
-            url = '/'.join([stem, command_str])
-            # Finally add the encoded data. We need to add the data in this manner
-            # rather than using the Request object's 'data' parameter so the
-            # request is sent as a GET request rather than a POST request.
-            full_url = '?'.join([url, data_enc])
-            # create a Request object
-            req = urllib.request.Request(url=full_url, headers=headers_dict)
-            for attempt in range(self.max_tries):
-                try:
-                    # submit the request and obtain the raw response
-                    with urllib.request.urlopen(req, timeout=self.timeout) as w:
-                        # get charset used so we can decode the stream correctly
-                        char_set = w.headers.get_content_charset()
-                        # Now get the response and decode it using the headers
-                        # character set. Be prepared for charset==None.
-                        if char_set is not None:
-                            resp = w.read().decode(char_set)
-                        else:
-                            resp = w.read().decode()
-                except socket.timeout as e:
-                    # we timed out and failed to obtain data on this attempt,
-                    # log it
-                    if weewx.debug >= 2:
-                        log.debug('Failed to get device data on attempt %d of %d' % (attempt +1,
+            # Construct the request path and add the encoded data. We need to
+            # add the data in this manner so the request is sent as a GET
+            # request rather than a POST request.
+            path = '?'.join(['/'.join(['', command_str]), data_enc])
+            # only one request at a time may use the persistent connection
+            with self._connection_lock:
+                for attempt in range(self.max_tries):
+                    try:
+                        # submit the request and obtain the decoded response
+                        resp = self._get(path, headers_dict)
+                    except socket.timeout as e:
+                        # we timed out and failed to obtain data on this
+                        # attempt, log it
+                        if weewx.debug >= 2:
+                            log.debug('Failed to get device data on attempt %d of %d',
+                                      attempt + 1, self.max_tries)
+                    except urllib.error.URLError as e:
+                        # we encountered an error, log the error and raise it
+                        log.error('Failed to get device data on attempt %d of %d' % (attempt + 1,
                                                                                      self.max_tries))
-                except urllib.error.URLError as e:
-                    # we encountered an error, log the error and raise it
-                    log.error('Failed to get device data on attempt %d of %d' % (attempt + 1,
-                                                                                 self.max_tries))
-                    log.error('   **** %s' % e)
-                    raise
+                        log.error('   **** %s' % e)
+                        raise
+                    else:
+                        # our attempt was successful, break out of the for loop
+                        break
                 else:
-                    # our attempt was successful, break out of the for loop
-                    break
-            else:
-                # the for loop terminated normally, so we exhausted all
-                # attempts without success
-                log.debug('Failed to get device data after %d attempts' % self.max_tries)
+                    # the for loop terminated normally, so we exhausted all
+                    # attempts without success, log it and raise a timeout as
+                    # we have no response to process
+                    log.debug('Failed to get device data after %d attempts', self.max_tries)
+                    raise socket.timeout(f'timed out after {self.max_tries:d} attempts')
             # Do a little massaging of the response, Ecowitt refers to some
             # wsxx devices as whxx in the API, fix this at the source. The
             # device model numbers are fairly unique so a simple replace will
@@ -5354,20 +5290,108 @@ class EcowittHttpApi:
             # we have a response but can it be deserialized it to a python
             # object, wrap in a try..except in case it cannot be deserialized
             try:
-                resp_json = json.loads(resp)
+                resp_json = json_loads(resp)
             except json.JSONDecodeError as e:
                 # cannot deserialize the response, log it and return None
                 log.error('Cannot deserialize device response')
                 log.error('   **** %s' % e)
                 return None
-            # we have a deserialized response, log it as required
-            if weewx.debug >= 3:
-                log.debug('Deserialized HTTP response: %s' % json.dumps(resp_json))
+            # we have a deserialized response, log it as required, but avoid
+            # re-serialising the response unless debug level messages will
+            # actually be emitted
+            if weewx.debug >= 3 and log.isEnabledFor(logging.DEBUG):
+                log.debug('Deserialized HTTP response: %s', json.dumps(resp_json))
             # now return the JSON object
             return resp_json
         # an invalid command
         raise UnknownApiCommand(f"Unknown HTTP API command '{command_str}'")
 
+    def _get(self, path, headers):
+        """Send a GET request to the device using the persistent connection.
+
+        The persistent connection is (re)established if required. The device
+        may close an idle kept-alive connection between requests, so if a
+        re-used connection is found to have been closed the request is retried
+        once on a new connection.
+
+        Connection and HTTP protocol errors are raised as a URLError, HTTP
+        error status codes are raised as a HTTPError. As per urllib, a timeout
+        while connecting, sending the request or waiting for the response is
+        raised as a URLError, whereas a timeout while reading the response
+        body is raised as socket.timeout.
+
+        path:    the request path including any encoded data
+        headers: a dict containing headers to be included in the HTTP request
+
+        Returns the decoded response body as a string.
+        """
+
+        # are we about to re-use an existing connection
+        reused = self._connection is not None
+        while True:
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.ip_address,
+                                                              timeout=self.timeout)
+            try:
+                # submit the request and obtain the response
+                self._connection.request('GET', path, headers=headers)
+                response = self._connection.getresponse()
+            except (ConnectionResetError, BrokenPipeError,
+                    http.client.BadStatusLine) as e:
+                # the connection was closed by the device, if it was a re-used
+                # connection try once more on a new connection
+                self._close()
+                if reused:
+                    reused = False
+                    continue
+                raise urllib.error.URLError(e)
+            except (http.client.HTTPException, OSError) as e:
+                # any other error, including a timeout, raise it as a
+                # URLError
+                self._close()
+                raise urllib.error.URLError(e)
+            try:
+                # obtain the raw response body
+                body = response.read()
+            except socket.timeout:
+                self._close()
+                raise
+            except (http.client.HTTPException, OSError) as e:
+                self._close()
+                raise urllib.error.URLError(e)
+            break
+        # if the device will not keep the connection alive close our end
+        if response.will_close:
+            self._close()
+        if response.status >= 400:
+            raise urllib.error.HTTPError(f'http://{self.ip_address}{path}',
+                                         response.status, response.reason,
+                                         response.headers, None)
+        # get charset used so we can decode the response correctly, be
+        # prepared for charset==None
+        char_set = response.headers.get_content_charset()
+        return body.decode(char_set) if char_set is not None else body.decode()
+
+    def close(self):
+        """Close the persistent connection to the device.
+
+        The connection may be in use by a request in another thread, so wait
+        for any such request to complete before closing the connection.
+        """
+
+        with self._connection_lock:
+            self._close()
+
+    def _close(self):
+        """Close the persistent connection to the device.
+
+        Must be called while holding the connection lock.
+        """
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
     def get_version(self):
         """Get the device firmware related information.
 
@@ -7552,22 +7576,27 @@ class EcowittHttpParser:
         # 'dot-field' mapping simple we need to return a dict of data not a
         # list of dicts. Create an empty dict to hold our results.
         result = dict()
+        # obtain a local reference to our processor function lookup, saves an
+        # attribute lookup for each array element
+        processor_fns = self.processor_fns
         # iterate over the array elements in the response
         for item in response:
-            # we need an id to identify the observation we are to process
-            if 'id' in item:
+            # we need an id to identify the observation we are to process,
+            # obtain the id once and use it for all subsequent lookups
+            item_id = item.get('id')
+            if item_id is not None:
                 # call the relevant method to process each observation
                 # first obtain the method name, wrap in a try..except in case
                 # it is an observation we do not know about
                 try:
-                    processor_fn = self.processor_fns[item['id']]
+                    processor_fn = processor_fns[item_id]
                 except KeyError:
                     # A KeyError means there is no processor function entry for
                     # this id in the processor function lookup. We have an id
                     # we cannot lookup, log it and continue.
                     if weewx.debug or self.debug.parser or self.log_unknown_fields:
                         log.info("Skipped unknown livedata observation ID '%s'",
-                                 item['id'])
+                                 item_id)
                     continue
                 except AttributeError:
                     # An AttributeError was raised. This means there is no
@@ -7575,7 +7604,7 @@ class EcowittHttpParser:
                     # but if it does log it and continue.
                     if weewx.debug or self.debug.parser:
                         log.info("Processor function not found for livedata "
-                                 "observation ID '%s'", item['id'])
+                                 "observation ID '%s'", item_id)
                     continue
                 # We have a processor function so process the item. Wrap in a
                 # try..except in case an error is encountered during processing
@@ -7587,12 +7616,12 @@ class EcowittHttpParser:
                     # our debug settings log it and set the item to None
                     if weewx.debug >= 2 or self.debug.parser:
                         log.info("Error processing common_list ID '%s': %s",
-                                 item['id'], e)
-                    result[item['id']] = {'val': None}
+                                 item_id, e)
+                    result[item_id] = {'val': None}
                 else:
                     # we obtained some processed data for the observation
                     # so add it to our result
-                    result[item['id']] = processed_item
+                    result[item_id] = processed_item
         # finally, return the result
         return result
 
@@ -8781,7 +8810,7 @@ class EcowittHttpParser:
             if _name is not None:
                 # look for a sub-string starting with 'CH' and ending with an
                 # integer
-                _match = re.search('CH\d+', _name)
+                _match = _RE_CHANNEL.search(_name)
                 # if a 'CH-integer' sub-string was found convert to lower case
                 # and use the sub-string as the channel
                 if _match is not None:
@@ -9586,7 +9615,7 @@ class EcowittHttpParser:
         # look for the unit string in the obs value field
         try:
             # extract the value and label via a regex
-            _value, _unit = re.match("([0-9.,+-]+)(.*)", json_object[key]).group(1,2)
+            _value, _unit = _RE_VALUE_UNIT.match(json_object[key]).group(1,2)
             # remove any leading or trailing whitespace from the unit string
             # and convert to lower case
             _unit = _unit.strip().lower()
@@ -10331,6 +10360,11 @@ class EcowittDevice:
         # start off logging failures
         self.log_failures = True
 
+    def close(self):
+        """Close any open connection to the device."""
+
+        self.api.close()
+
     def get_live_data(self, flatten_data=True):
         """Return live sensor observation data.
 
@@ -10976,7 +11010,7 @@ def natural_sort_keys(source_dict):
         Toothy's implementation in the comments)
         """
 
-        return [atoi(c) for c in re.split(r'(\d+)', text.lower())]
+        return [atoi(c) for c in _RE_DIGITS.split(text.lower())]
 
     # create a list of keys in the dict
     keys_list = list(source_dict.keys())
@@ -11004,6 +11038,25 @@ def natural_sort_dict(source_dict):
     return f'{{{", ".join(sorted_dict_fields)}}}'
 
 
+class LazyNaturalSortDict:
+    """Defer the natural sort of a dict for logging until it is formatted.
+
+    Passing natural_sort_dict(d) as a log message argument sorts and formats
+    the dict even if the log record is subsequently discarded by a logger or
+    handler. A LazyNaturalSortDict object is a light weight wrapper around
+    the dict, the natural sort only occurs when the log record is formatted
+    and the wrapper is converted to a string.
+    """
+
+    __slots__ = ('source_dict',)
+
+    def __init__(self, source_dict):
+        self.source_dict = source_dict
+
+    def __str__(self):
+        return natural_sort_dict(self.source_dict)
+
+
 def bytes_to_hex(iterable, separator=' ', caps=True):
     """Produce a hex string representation of a sequence of bytes."""
 
@@ -11064,23 +11117,36 @@ def flatten(dictionary, parent_key=False, separator='.'):
         # 'dictionary' is not a dict, return the value None
         return None
     else:
-        items = []
-        for key, value in dictionary.items():
-            new_key = str(parent_key) + separator + key if parent_key else key
-            if isinstance(value, MutableMapping):
-                if not value.items():
-                    items.append((new_key, None))
-                else:
-                    items.extend(flatten(value, new_key, separator).items())
-            elif isinstance(value, list):
-                if len(value):
-                    for k, v in channelise_enumerate(value, channelise=True):
-                        items.extend(flatten({str(k): v}, new_key, separator).items())
-                else:
-                    items.append((new_key,None))
+        # Populate a single result dict in place rather than building (and
+        # then discarding) an intermediate dict and list of items at each
+        # level of nesting.
+        result = {}
+        _flatten_into(result, dictionary, parent_key, separator)
+        return result
+
+
+def _flatten_into(result, dictionary, parent_key, separator):
+    """Add the flattened contents of a nested dictionary to a result dict.
+
+    Helper function for flatten(). Recursively walks 'dictionary' adding
+    flattened key/value pairs to 'result'.
+    """
+
+    for key, value in dictionary.items():
+        new_key = str(parent_key) + separator + key if parent_key else key
+        if isinstance(value, MutableMapping):
+            if not value:
+                result[new_key] = None
             else:
-                items.append((new_key, value))
-        return dict(items)
+                _flatten_into(result, value, new_key, separator)
+        elif isinstance(value, list):
+            if len(value):
+                for k, v in channelise_enumerate(value, channelise=True):
+                    _flatten_into(result, {str(k): v}, new_key, separator)
+            else:
+                result[new_key] = None
+        else:
+            result[new_key] = value
 
 
 def channelise_enumerate(iterable, start=0, channelise=False):
@@ -12718,8 +12784,9 @@ class DirectEcowittDevice:
             datetime = mapped_data.pop('datetime', int(time.time()))
             # TODO. Is this needed?
             # extend the WeeWX obs_group_dict with our Ecowitt device
-            # obs_group_dict
-            weewx.units.obs_group_dict.prepend(DEFAULT_GROUPS)
+            # obs_group_dict, obs_group_dict writes go to the first map so
+            # prepend a (writable) copy of our read only DEFAULT_GROUPS
+            weewx.units.obs_group_dict.prepend(dict(DEFAULT_GROUPS))
             # the live data is in self.unit_system units, if required get a
             # suitable converter based on our display units
             display_unit_system = weewx.units.unit_constants[self.namespace.units.upper()]
@@ -12773,7 +12840,7 @@ class DirectEcowittDevice:
             # Check if any of the discovered devices might be supported (ie the
             # device is not included in the supported or unsupported lists).
             # First obtain a list of such devices.
-            possible = [d for d in device_list if d['model'] not in KNOWN_DEVICES]
+            possible = [d for d in device_list if d['model'] not in KNOWN_DEVICES_SET]
             possible_supported_ip = []
             if len(possible) > 0:
                 # we have some unknown devices that may be supported
@@ -12789,7 +12856,7 @@ class DirectEcowittDevice:
             for device in sorted_list:
                 if (device['ip_address'] is not None and
                         device['model'] is not None and
-                        device['model'] in SUPPORTED_DEVICES):
+                        device['model'] in SUPPORTED_DEVICES_SET):
                     if not print_label:
                         print('Supported Devices')
                         printed_anything = True
@@ -12833,7 +12900,7 @@ class DirectEcowittDevice:
             for device in sorted_list:
                 if (device['ip_address'] is not None and
                         device['model'] is not None and
-                        device['model'] in UNSUPPORTED_DEVICES):
+                        device['model'] in UNSUPPORTED_DEVICES_SET):
                     if not print_label:
                         if not printed_anything:
                             print()
@@ -12905,70 +12972,82 @@ class DirectEcowittDevice:
         parser = EcowittHttpParser()
         # create a socket object so we can receive IPv4 UDP
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # set timeout
-        s.settimeout(self.namespace.discovery_timeout)
+        # we will poll the socket for readiness rather than block on each
+        # receive, so make the socket non-blocking
+        s.setblocking(False)
         # bind our socket to the port we are using
         s.bind(("", self.namespace.discovery_port))
+        # obtain a selector and register our socket for read events
+        sel = selectors.DefaultSelector()
+        sel.register(s, selectors.EVENT_READ)
         # initialise a list for the results as multiple devices may respond
         result_list = []
-        # get the current time
-        start_ts = time.time()
-        # start receiving continuously, we will stop once our discovery period
-        # has elapsed
-        while True:
-            # wrap in try .. except to capture any errors
-            try:
-                # receive a response
-                response = s.recv(1024)
-                # # if required display the response packet
-                # if self.debug:
-                #     _first_row = True
-                #     for row in gen_pretty_bytes_as_hex(response, quote=False):
-                #         if _first_row:
-                #             print()
-                #             print(f'Received broadcast packet: {row["hex"]}')
-                #             _first_row = False
-                #         else:
-                #             print(f'                           {row["hex"]}')
-                #         print(f'                           {row["printable"]}')
-            except socket.timeout:
-                # if we time out then we are done with this attempt
-                break
-            except socket.error:
-                # raise any other socket error
-                raise
-            # Check the response is valid. As it happens the broadcast from
-            # each device on port 59387 is identical to the response to a
-            # device response to CMD_BROADCAST telnet API command. The validity
-            # of the response can be checked by (1) confirming byte 2 is 0x12
-            # and (2) verifying the packet checksum in last byte.
-            # first check we have a response
-            if response is not None and len(response) > 3:
-                # now check that byte 2 == 0x12
-                if response[2] != 0x12:
-                    continue
-                # and finally verify the checksum
-                if calc_checksum(response[2:-1]) != response[-1]:
-                    continue
-            else:
-                continue
-            # if we made it here we have a valid broadcast response, so decode
-            # the response and obtain a dict of device data
-            found_device_dict = self.decode_broadcast_response(response)
-            # if we haven't seen this MAC before attempt to obtain and save the
-            # device model then add the device to our result list
-            if not any((d['mac'] == found_device_dict['mac']) for d in result_list):
-                # determine the device model based on the device SSID and add
-                # the model to the device dict
-                found_device_dict['model'] = parser.get_model_from_firmware(found_device_dict.get('ssid'))
-                # append the device to our list
-                result_list.append(found_device_dict)
-            # has our discovery period elapsed, if it has break out of the
-            # loop
-            if time.time() - start_ts > self.discovery_period:
-                break
-        # we are done, close our socket
-        s.close()
+        # keep track of the MAC addresses we have seen so each device is
+        # included in the results once only
+        seen_macs = set()
+        # determine when our discovery period will end
+        deadline = time.monotonic() + self.discovery_period
+        # Poll the socket until our discovery period has elapsed or we have
+        # not received anything for the discovery timeout period, whichever
+        # occurs first. Wrap in a try..finally so we always release our
+        # selector and socket.
+        try:
+            while True:
+                # how long until our discovery period ends
+                remaining = deadline - time.monotonic()
+                # if our discovery period has elapsed we are done
+                if remaining <= 0:
+                    break
+                # wait for the socket to become readable, but not for longer
+                # than the discovery timeout or the remaining discovery period
+                events = sel.select(timeout=min(self.namespace.discovery_timeout,
+                                                remaining))
+                # if nothing was received before we timed out we are done
+                if not events:
+                    break
+                # the socket is readable, receive all queued broadcasts before
+                # we poll again
+                while True:
+                    # wrap in try .. except to capture any errors
+                    try:
+                        # receive a response
+                        response = s.recv(1024)
+                    except BlockingIOError:
+                        # there is nothing more to receive for now
+                        break
+                    # Check the response is valid. As it happens the broadcast
+                    # from each device on port 59387 is identical to the
+                    # response to a device response to CMD_BROADCAST telnet
+                    # API command. The validity of the response can be checked
+                    # by (1) confirming byte 2 is 0x12 and (2) verifying the
+                    # packet checksum in last byte.
+                    # first check we have a response
+                    if response is not None and len(response) > 3:
+                        # now check that byte 2 == 0x12
+                        if response[2] != 0x12:
+                            continue
+                        # and finally verify the checksum
+                        if calc_checksum(response[2:-1]) != response[-1]:
+                            continue
+                    else:
+                        continue
+                    # if we made it here we have a valid broadcast response, so
+                    # decode the response and obtain a dict of device data
+                    found_device_dict = self.decode_broadcast_response(response)
+                    # if we haven't seen this MAC before attempt to obtain and
+                    # save the device model then add the device to our result
+                    # list
+                    if found_device_dict['mac'] not in seen_macs:
+                        seen_macs.add(found_device_dict['mac'])
+                        # determine the device model based on the device SSID
+                        # and add the model to the device dict
+                        found_device_dict['model'] = parser.get_model_from_firmware(found_device_dict.get('ssid'))
+                        # append the device to our list
+                        result_list.append(found_device_dict)
+        finally:
+            # we are done, close our selector and socket
+            sel.close()
+            s.close()
         # now return our results
         return result_list
 
@@ -24,8 +24,10 @@ To run the test suite:
     PYTHONPATH=/home/weewx/weewx-data/bin:/home/weewx/weewx/src python3 -m user.tests.test_http
 """
 # python imports
+import http.client
 import io
 import os
+import queue
 import socket
 import struct
 import sys
@@ -130,6 +132,8 @@ class DebugOptionsTestCase(unittest.TestCase):
             self.assertFalse(getattr(debug_options, group))
         # check 'any' property
         self.assertFalse(debug_options.any)
+        # check 'flags' property
+        self.assertEqual(debug_options.flags, frozenset())
 
         # test when passing in an empty config dict
         debug_options = user.ecowitt_http.DebugOptions(**{})
@@ -145,6 +149,8 @@ class DebugOptionsTestCase(unittest.TestCase):
             self.assertTrue(getattr(debug_options, group))
         # check 'any' property
         self.assertTrue(debug_options.any)
+        # check 'flags' property
+        self.assertEqual(debug_options.flags, frozenset(self.debug_groups))
 
         # check when just one debug option is True
         print('    testing setting one debug option at a time...')
@@ -166,6 +172,9 @@ class DebugOptionsTestCase(unittest.TestCase):
                     self.assertFalse(getattr(debug_options, group))
             # check 'any' property, it should be True
             self.assertTrue(debug_options.any)
+            # check 'flags' property, it should contain only the group under
+            # test
+            self.assertEqual(debug_options.flags, frozenset((true_group,)))
 
         # check when all but one debug option is True
         print('    testing setting all but one debug option at a time...')
@@ -197,6 +206,175 @@ class DebugOptionsTestCase(unittest.TestCase):
             self.assertTrue(debug_options.any)
 
 
+class InvertibleMapTestCase(unittest.TestCase):
+    """Test the InvertibleMap class."""
+
+    test_dict = {'a': 1, 'b': 2, 'c': 3}
+
+    def test_map(self):
+        """Test InvertibleMap forward and inverse operation."""
+
+        print()
+        print('    testing InvertibleMap initialisation...')
+        inv_map = user.ecowitt_http.InvertibleMap(self.test_dict)
+        # the forward map should match the source dict
+        self.assertDictEqual(dict(inv_map), self.test_dict)
+        # the inverse map should be the inverse of the source dict
+        self.assertDictEqual(dict(inv_map.inverse),
+                             {v: k for k, v in self.test_dict.items()})
+        # the inverse of the inverse should be the map itself
+        self.assertIs(inv_map.inverse.inverse, inv_map)
+        # duplicate values should be accepted on initialisation, the inverse
+        # maps the value to the last key with that value
+        dup_map = user.ecowitt_http.InvertibleMap({'a': 1, 'b': 1})
+        self.assertDictEqual(dict(dup_map), {'a': 1, 'b': 1})
+        self.assertEqual(dup_map.inverse[1], 'b')
+
+        print('    testing InvertibleMap set/pop...')
+        inv_map['d'] = 4
+        self.assertEqual(inv_map.inverse[4], 'd')
+        # setting an existing value should be rejected
+        with self.assertRaises(user.ecowitt_http.InvertibleSetError):
+            inv_map['e'] = 4
+        self.assertEqual(inv_map.pop('d'), 4)
+        self.assertNotIn(4, inv_map.inverse)
+
+        print('    testing InvertibleMap rekey...')
+        inv_map['d'] = 4
+        inv_map.rekey('d', 'dd')
+        self.assertNotIn('d', inv_map)
+        self.assertEqual(inv_map['dd'], 4)
+        self.assertEqual(inv_map.inverse[4], 'dd')
+        self.assertEqual(inv_map.pop('dd'), 4)
+
+        print('    testing InvertibleMap copy...')
+        inv_copy = inv_map.copy()
+        self.assertIsInstance(inv_copy, user.ecowitt_http.InvertibleMap)
+        self.assertDictEqual(dict(inv_copy), dict(inv_map))
+        self.assertIs(inv_copy.inverse.inverse, inv_copy)
+        # changes to the copy should not affect the original
+        inv_copy['e'] = 5
+        self.assertNotIn('e', inv_map)
+        self.assertNotIn(5, inv_map.inverse)
+
+
+class HttpMapperTestCase(unittest.TestCase):
+    """Test the HttpMapper class."""
+
+    def test_map_data_duplicate_source(self):
+        """Test mapping a device field to more than one WeeWX field."""
+
+        print()
+        print('    testing HttpMapper duplicate source field mapping...')
+        # a mapper config that maps a device field to more than one WeeWX
+        # field should map the device field to each WeeWX field
+        mapper = user.ecowitt_http.HttpMapper(field_map_extensions={'a': 'wh25.intemp',
+                                                                    'b': 'wh25.intemp'})
+        self.assertEqual(mapper.field_map['a'], 'wh25.intemp')
+        self.assertEqual(mapper.field_map['b'], 'wh25.intemp')
+        # mapped data should include each WeeWX field
+        self.assertDictEqual(mapper.map_data({'wh25.intemp': 21.5}),
+                             {'a': 21.5, 'b': 21.5})
+
+
+class CollectorTestCase(unittest.TestCase):
+    """Test the Collector class."""
+
+    def test_put_newest(self):
+        """Test Collector.put_newest() drop oldest behaviour."""
+
+        print()
+        print('    testing Collector.put_newest()...')
+        collector = user.ecowitt_http.Collector(max_queue_size=3)
+        # fill the queue and then add two more items
+        for i in range(5):
+            collector.put_newest(i)
+        # the queue should hold the newest three items, oldest first
+        self.assertEqual([collector.get(0) for _ in range(3)], [2, 3, 4])
+        # and the queue should now be empty
+        with self.assertRaises(queue.Empty):
+            collector.get(0.01)
+        # a latest data only collector should only keep the newest sensor
+        # data
+        collector = user.ecowitt_http.Collector(latest_data_only=True)
+        for i in range(3):
+            collector.put_newest({'datetime': i})
+        self.assertEqual(collector.drain_queue(0.01), [{'datetime': 2}])
+        # control data should not displace sensor data and items should be
+        # returned in the order they were produced
+        error = user.ecowitt_http.DeviceIOError('test')
+        collector.put_newest({'datetime': 3})
+        collector.put_newest(error)
+        collector.put_newest({'datetime': 4})
+        collector.put_newest({'datetime': 5})
+        self.assertEqual(collector.drain_queue(0.01),
+                         [{'datetime': 3}, error, {'datetime': 5}])
+        self.assertEqual(collector.drain_queue(0.01), [])
+
+    def test_drain_queue(self):
+        """Test Collector.drain_queue()."""
+
+        print()
+        print('    testing Collector.drain_queue()...')
+        collector = user.ecowitt_http.Collector()
+        # an empty queue should give an empty list once the timeout expires
+        self.assertEqual(collector.drain_queue(0.01), [])
+        # all queued items should be returned, oldest first
+        for i in range(3):
+            collector.put_newest(i)
+        self.assertEqual(collector.drain_queue(0.01), [0, 1, 2])
+        # and the queue should now be empty
+        self.assertEqual(collector.drain_queue(0.01), [])
+
+
+class HttpApiTestCase(unittest.TestCase):
+    """Test the EcowittHttpApi class."""
+
+    # patch.object to allow mocking of http.client.HTTPConnection.connect()
+    @patch.object(http.client.HTTPConnection, 'connect')
+    def test_connect_timeout(self, mock_connect):
+        """Test EcowittHttpApi handling of a timeout when connecting.
+
+        A timeout when connecting to the device should result in a
+        DeviceIOError being raised, as is the case for any other failure to
+        contact the device.
+        """
+
+        print()
+        print('    testing EcowittHttpApi connect timeout...')
+        # set mocked items
+        mock_connect.side_effect = socket.timeout('timed out')
+        api = user.ecowitt_http.EcowittHttpApi(ip_address='192.168.99.99',
+                                               max_tries=2,
+                                               retry_wait=0,
+                                               timeout=1)
+        with self.assertRaises(user.ecowitt_http.DeviceIOError):
+            api.get_livedata_info()
+        # the failed connection should not have been retained
+        self.assertIsNone(api._connection)
+
+    # patch.object to allow mocking of EcowittHttpApi._get()
+    @patch.object(user.ecowitt_http.EcowittHttpApi, '_get')
+    def test_read_timeout(self, mock_get):
+        """Test EcowittHttpApi handling of repeated read timeouts.
+
+        Exhausting all attempts due to read timeouts should result in a
+        DeviceIOError being raised.
+        """
+
+        print()
+        print('    testing EcowittHttpApi read timeouts...')
+        # set mocked items
+        mock_get.side_effect = socket.timeout('timed out')
+        api = user.ecowitt_http.EcowittHttpApi(ip_address='192.168.99.99',
+                                               max_tries=2,
+                                               retry_wait=0,
+                                               timeout=1)
+        with self.assertRaises(user.ecowitt_http.DeviceIOError):
+            api.get_livedata_info()
+        self.assertEqual(mock_get.call_count, 2)
+
+
 class ConfEditorTestCase(unittest.TestCase):
     """Test the EcowittHttpDriverConfEditor class."""
 
@@ -753,6 +931,77 @@ class ConfEditorTestCase(unittest.TestCase):
 
         print('    driver configuration editor rain settings testing complete...')
 
+    # patch.object to allow mocking of EcowittDevice.paired_rain_gauges property
+    @patch.object(user.ecowitt_http.EcowittDevice,
+                  'paired_rain_gauges',
+                  new_callable=unittest.mock.PropertyMock)
+    # patch.object to allow mocking of weecfg.prompt_with_options() function
+    @patch.object(weecfg, 'prompt_with_options')
+    def test_do_rain_tipping_none(self, mock_prompt_with_options, mock_paired_rain_gauges_property):
+        """Test conf editor rain config when changing from tipping to none.
+
+        A config that uses a tipping gauge to derive WeeWX field 'rain' is
+        changed to use no gauge. The default WeeWX per-period tipping rain
+        field calculation should be restored.
+        """
+
+        print()
+        print('    testing driver configuration editor rain settings tipping to none...')
+        # store original stdout
+        original_stdout = sys.stdout
+
+        # set mocked items, a tipping gauge is paired and the user selects no
+        # gauge to populate the WeeWX rain fields
+        mock_prompt_with_options.side_effect = ['tipping', 'none']
+        mock_paired_rain_gauges_property.return_value = ('tipping',)
+        # obtain a config using a tipping gauge to derive WeeWX field 'rain'
+        test_input = configobj.ConfigObj(io.StringIO(ConfEditorTestCase.minimal_driver_config_str))
+        test_input.merge({'StdWXCalculate': {'Calculations': {'rain': 'prefer_hardware'},
+                                             'Delta': {'rain': {'input': 't_rainyear'}}}})
+        # redirect stdout to a StringIO object
+        sys.stdout = io.StringIO()
+        try:
+            user.ecowitt_http.EcowittHttpDriverConfEditor.do_rain(test_input)
+        finally:
+            # restore stdout
+            sys.stdout = original_stdout
+        # the default WeeWX per-period tipping rain field calculation should
+        # have been restored
+        self.assertEqual(test_input['StdWXCalculate']['Calculations']['t_rain'], 'prefer_hardware')
+        self.assertDictEqual(test_input['StdWXCalculate']['Delta']['t_rain'], {'input': 't_rainyear'})
+
+        print('    driver configuration editor rain settings tipping to none testing complete...')
+
+    def test_do_extractors(self):
+        """Test conf editor extractor config."""
+
+        print()
+        print('    testing driver configuration editor extractor settings...')
+
+        # store original stdout
+        original_stdout = sys.stdout
+
+        # obtain the minimal test config and add an [Accumulator] stanza with
+        # a user extractor setting for a driver field and a non-driver field
+        test_input = configobj.ConfigObj(io.StringIO(ConfEditorTestCase.minimal_driver_config_str))
+        test_input['Accumulator'] = {'t_rain': {'extractor': 'max'},
+                                     'foo': {'extractor': 'last'}}
+        # redirect stdout to a StringIO object
+        sys.stdout = io.StringIO()
+        user.ecowitt_http.EcowittHttpDriverConfEditor.do_extractors(test_input)
+        # restore stdout
+        sys.stdout = original_stdout
+        # the existing extractor settings should be unchanged
+        self.assertEqual(test_input['Accumulator']['t_rain']['extractor'], 'max')
+        self.assertEqual(test_input['Accumulator']['foo']['extractor'], 'last')
+        # the remaining driver extractor settings should have been added
+        self.assertEqual(test_input['Accumulator']['p_rain']['extractor'], 'sum')
+        self.assertEqual(test_input['Accumulator']['ws80_sig']['extractor'], 'last')
+        # the rest of the config should be unchanged
+        self.assertEqual(test_input['EcowittHttp']['ip_address'], '192.168.99.99')
+
+        print('    driver configuration editor extractor settings testing complete...')
+
     def test_accumulator_config(self):
         """Test conf editor accumulator config.
 
@@ -770,7 +1019,7 @@ class ConfEditorTestCase(unittest.TestCase):
         test_fields = list(mapper.default_sensor_state_map.keys())
         test_fields += list(mapper.default_rain_map.keys())
 #        default_accum_fields = set(schema_fields) | set(driver_fields)
-        accum_config_dict = configobj.ConfigObj(io.StringIO(user.ecowitt_http.EcowittHttpDriverConfEditor.accum_config_str))
+        accum_config_dict = user.ecowitt_http.EcowittHttpDriverConfEditor.accum_config()
         accum_config_dict_fields = accum_config_dict['Accumulator'].sections
         exclusions = ('wn34_ch1_volt', 'wn34_ch2_volt', 'wn34_ch3_volt', 'wn34_ch4_volt',
                       'wn34_ch5_volt', 'wn34_ch6_volt', 'wn34_ch7_volt', 'wn34_ch8_volt',
@@ -2439,7 +2688,8 @@ class UtilitiesTestCase(unittest.TestCase):
         Tests:
         1. natural_sort_keys()
         2. natural_sort_dict()
-        3. bytes_to_hex()
+        3. LazyNaturalSortDict()
+        4. bytes_to_hex()
         """
 
         print()
@@ -2453,6 +2703,11 @@ class UtilitiesTestCase(unittest.TestCase):
         self.assertEqual(user.ecowitt_http.natural_sort_dict(self.unsorted_dict),
                          self.sorted_dict_str)
 
+        print('    testing LazyNaturalSortDict()...')
+        # test LazyNaturalSortDict()
+        self.assertEqual(str(user.ecowitt_http.LazyNaturalSortDict(self.unsorted_dict)),
+                         self.sorted_dict_str)
+
         print('    testing bytes_to_hex()...')
         # test bytes_to_hex()
         # with defaults
@@ -2586,8 +2841,9 @@ def main():
     # test_cases = (DebugOptionsTestCase, SensorsTestCase, HttpParserTestCase,
     #               UtilitiesTestCase, ListsAndDictsTestCase, StationTestCase,
     #               GatewayServiceTestCase, GatewayDriverTestCase)
-    test_cases = (DebugOptionsTestCase, HttpParserTestCase,
-                  EcowittSensorsTestCase, UtilitiesTestCase,
+    test_cases = (DebugOptionsTestCase, InvertibleMapTestCase, HttpMapperTestCase,
+                  CollectorTestCase, HttpApiTestCase,
+                  HttpParserTestCase, EcowittSensorsTestCase, UtilitiesTestCase,
                   ConfEditorTestCase) #SensorsTestCase, HttpParserTestCase,
 #                  DeviceCatchupTestCase, ConfEditorTestCase) #SensorsTestCase, HttpParserTestCase,
 #                  ListsAndDictsTestCase, StationTestCase,